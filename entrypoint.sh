@@ -1,5 +1,17 @@
 #!/bin/bash
+set -e
 
-python3 manage.py migrate
-#Running the Django server
-python3 manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+case "$1" in
+  migrate)
+    # One-shot step: apply migrations before the application servers start
+    exec python3 manage.py migrate --noinput
+    ;;
+  dev)
+    #Running the Django development server
+    exec python3 manage.py runserver 0.0.0.0:8000
+    ;;
+  *)
+    #Running the production server (see gunicorn.conf.py)
+    exec gunicorn -c gunicorn.conf.py
+    ;;
+esac
@@ -0,0 +1,114 @@
+"""
+The OpenAPI schema is generated once and served from memory with a content-hash ETag,
+instead of walking every view and serializer on each request. Deployments prebuild
+it to OPENAPI_SCHEMA_DIR with the build_openapi_schema management command.
+"""
+
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory
+from django.utils.cache import get_conditional_response
+from django.views import View
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from rest_framework.request import Request
+
+API_INFO = openapi.Info(
+    title="Online Store api",
+    default_version="v1",
+    description="API for an online store. Allows retrieving information about products,"
+    "categories, placing orders, and much more.",
+)
+
+# Served formats, matching the "swagger<format>/" URL
+SCHEMA_CODECS = {
+    ".json": OpenAPICodecJson,
+    ".yaml": OpenAPICodecYaml,
+}
+
+_schemas = {}
+_schemas_lock = threading.Lock()
+
+
+def build_schema() -> dict[str, bytes]:
+    """
+    Generates the public schema of every endpoint and encodes it in each served format.
+    """
+    # Views inspect the request method while their schema is generated
+    request = Request(RequestFactory().get("/"))
+    schema = OpenAPISchemaGenerator(API_INFO).get_schema(request=request, public=True)
+    # Without a host, clients resolve paths against the server they fetched the schema from
+    schema.pop("host", None)
+    schema.pop("schemes", None)
+    return {
+        schema_format: codec_class(validators=[]).encode(schema)
+        for schema_format, codec_class in SCHEMA_CODECS.items()
+    }
+
+
+def get_schema_path(schema_format: str) -> str:
+    return os.path.join(settings.OPENAPI_SCHEMA_DIR, f"swagger{schema_format}")
+
+
+def write_schema() -> list[str]:
+    """
+    Regenerates the schema files in OPENAPI_SCHEMA_DIR and returns their paths.
+    """
+    os.makedirs(settings.OPENAPI_SCHEMA_DIR, exist_ok=True)
+    paths = []
+    for schema_format, content in build_schema().items():
+        path = get_schema_path(schema_format)
+        with open(path, "wb") as file:
+            file.write(content)
+        paths.append(path)
+    return paths
+
+
+def load_schemas() -> dict[str, tuple[bytes, str]]:
+    """
+    Returns the content and ETag of every format, read from the prebuilt files or generated
+    once per process. Prebuilt files are ignored in DEBUG so the schema follows code changes.
+    """
+    if _schemas:
+        return _schemas
+
+    with _schemas_lock:
+        if not _schemas:
+            paths = [get_schema_path(schema_format) for schema_format in SCHEMA_CODECS]
+            if not settings.DEBUG and all(os.path.exists(path) for path in paths):
+                contents = {}
+                for schema_format, path in zip(SCHEMA_CODECS, paths):
+                    with open(path, "rb") as file:
+                        contents[schema_format] = file.read()
+            else:
+                contents = build_schema()
+
+            for schema_format, content in contents.items():
+                etag = f'"{hashlib.sha256(content).hexdigest()}"'
+                _schemas[schema_format] = (content, etag)
+    return _schemas
+
+
+class OpenAPISchemaView(View):
+    """
+    Serves the precomputed schema, answering If-None-Match with 304.
+    """
+
+    def get(self, request, format):
+        try:
+            content, etag = load_schemas()[format]
+        except KeyError:
+            raise Http404(f"Unsupported schema format: {format}")
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                content, content_type=SCHEMA_CODECS[format].media_type
+            )
+        response["ETag"] = etag
+        return response
@@ -0,0 +1,65 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.authentication import TokenAuthentication
+
+from config.constants import TOKEN_CACHE_TIMEOUT
+from instrumentation import timed
+
+# The only user fields the permission classes and the Server-Timing check read
+CACHED_USER_FIELDS = ("id", "role", "is_active", "is_staff")
+
+
+def token_cache_key(key: str) -> str:
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    # Versioned, so entries cached in an older format aren't read
+    return f"auth:token:v2:{digest}"
+
+
+def invalidate_token(key: str) -> None:
+    # Deleted once the change commits, so a concurrent request can't cache the old values again
+    transaction.on_commit(lambda: cache.delete(token_cache_key(key)))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches the token owner's id, role, active and staff flags,
+    so authenticated requests don't query authtoken_token and users_user.
+    Other user fields are deferred and loaded from the database on first access.
+    Invalidation must reach every process, so nothing is cached without a shared cache.
+    Tokens are invalidated on logout and when a user's cached fields change through
+    save() or QuerySet.update() (see users.signals and users.models.UserQuerySet).
+    """
+
+    def authenticate(self, request):
+        with timed("auth"):
+            return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        if not settings.SHARED_CACHE:
+            return super().authenticate_credentials(key)
+        cache_key = token_cache_key(key)
+        values = cache.get(cache_key)
+        if values is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(
+                cache_key,
+                {field: getattr(user, field) for field in CACHED_USER_FIELDS},
+                TOKEN_CACHE_TIMEOUT,
+            )
+            return user, token
+
+        model = get_user_model()
+        # from_db() takes the values in the order of the model's fields
+        field_names = [
+            field.attname
+            for field in model._meta.concrete_fields
+            if field.attname in values
+        ]
+        user = model.from_db(
+            DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names]
+        )
+        return user, self.get_model()(key=key, user=user)
@@ -2,3 +2,24 @@ from decimal import Decimal
 
 DEFAULT_PAGINATION_SIZE = 10
 LOSS_FACTOR = Decimal("0.95")
+
+# Text search configuration used by the product name full-text index and filter
+PRODUCT_SEARCH_CONFIG = "simple"
+
+# Lifetime of cached catalog responses, in seconds
+CATALOG_CACHE_TIMEOUT = 60 * 15
+
+# Number of rows validated and written per batch by the bulk product import
+BULK_IMPORT_CHUNK_SIZE = 1000
+
+# Number of products validated and updated per statement by the bulk repricing
+REPRICE_CHUNK_SIZE = 1000
+
+# Number of products deleted per transaction when a category is deleted
+CATEGORY_DELETE_CHUNK_SIZE = 5000
+
+# Number of rows fetched per round trip from the server-side cursor by the catalog export
+EXPORT_CHUNK_SIZE = 2000
+
+# Lifetime of cached token owners, in seconds
+TOKEN_CACHE_TIMEOUT = 60 * 5
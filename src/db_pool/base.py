@@ -0,0 +1,84 @@
+"""
+PostgreSQL backend that checks connections out of a per-process pool.
+
+Django closes the connection at the end of each request when CONN_MAX_AGE is 0;
+with this backend closing returns it to the pool instead, so requests skip the
+connect and authentication handshake. Configure it through the POOL key of the
+database settings: MIN_SIZE, MAX_SIZE and TIMEOUT.
+"""
+
+import os
+import threading
+
+from django.db.backends.postgresql.base import (
+    DatabaseWrapper as PostgresDatabaseWrapper,
+)
+
+from db_pool.pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool_stats() -> dict:
+    """
+    Returns the counters of every pool opened by the current process, keyed by database alias.
+    """
+    return {
+        alias: pool.get_stats()
+        for alias, pool in _pools.items()
+        if pool.pid == os.getpid()
+    }
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    def get_pool(self, conn_params) -> ConnectionPool:
+        pool = _pools.get(self.alias)
+        # Connections must not be shared with a forked worker, so each process gets its own pool
+        if pool is not None and pool.pid == os.getpid():
+            return pool
+
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None or pool.pid != os.getpid():
+                options = self.settings_dict.get("POOL", {})
+                pool = ConnectionPool(
+                    connect=lambda: super(DatabaseWrapper, self).get_new_connection(
+                        conn_params
+                    ),
+                    min_size=options.get("MIN_SIZE", 0),
+                    max_size=options.get("MAX_SIZE", 10),
+                    timeout=options.get("TIMEOUT", 30),
+                )
+                pool.fill()
+                _pools[self.alias] = pool
+        return pool
+
+    def get_new_connection(self, conn_params):
+        check = (
+            self._check_pooled_connection
+            if self.settings_dict["CONN_HEALTH_CHECKS"]
+            else None
+        )
+        return self.get_pool(conn_params).getconn(check=check)
+
+    @staticmethod
+    def _check_pooled_connection(connection) -> bool:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            # Don't leave the ping's implicit transaction open when autocommit is off
+            connection.rollback()
+        except PostgresDatabaseWrapper.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = _pools.get(self.alias)
+        if pool is None or pool.pid != os.getpid():
+            return super()._close()
+        # A connection closed inside an atomic block may still be referenced by it, so it can't be reused
+        with self.wrap_database_errors:
+            pool.putconn(self.connection, discard=self.in_atomic_block)
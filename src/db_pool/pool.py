@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import DatabaseError
+
+
+class PoolTimeout(DatabaseError):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of raw DB-API connections with usage counters.
+
+    Up to max_size connections are checked out at once; further checkouts wait in
+    FIFO order up to timeout seconds for a connection to be returned before raising
+    PoolTimeout.
+    """
+
+    def __init__(self, connect, min_size=0, max_size=10, timeout=30.0):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._idle = deque()
+        self._waiters = deque()
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self.stats = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_ms": 0.0,
+            "timeouts": 0,
+        }
+
+    def _acquire_slot(self):
+        with self._condition:
+            if self._in_use < self.max_size and not self._waiters:
+                self._in_use += 1
+                return
+
+            self.stats["waits"] += 1
+            ticket = object()
+            self._waiters.append(ticket)
+            started = time.monotonic()
+            try:
+                while self._waiters[0] is not ticket or self._in_use >= self.max_size:
+                    remaining = started + self.timeout - time.monotonic()
+                    if remaining <= 0:
+                        self.stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"Couldn't get a connection from the pool within {self.timeout}s "
+                            f"({self.max_size} connections in use)."
+                        )
+                    self._condition.wait(remaining)
+                self._in_use += 1
+            finally:
+                self._waiters.remove(ticket)
+                self.stats["wait_time_ms"] += (time.monotonic() - started) * 1000
+                self._condition.notify_all()
+
+    def _release_slot(self):
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify_all()
+
+    def getconn(self, check=None):
+        """
+        Returns an idle connection or opens a new one, waiting for a free slot if the pool is full.
+        Idle connections failing the optional check callable are discarded.
+        """
+        self._acquire_slot()
+        try:
+            while True:
+                with self._condition:
+                    connection = self._idle.pop() if self._idle else None
+                if connection is None:
+                    connection = self.connect()
+                    with self._condition:
+                        self.stats["connections_opened"] += 1
+                    break
+                if not connection.closed and (check is None or check(connection)):
+                    break
+                self._discard(connection)
+        except BaseException:
+            self._release_slot()
+            raise
+        with self._condition:
+            self.stats["checkouts"] += 1
+        return connection
+
+    def putconn(self, connection, discard=False):
+        """
+        Returns a connection to the pool, rolling back any open transaction.
+        Broken connections are closed instead of being kept idle.
+        """
+        try:
+            if not discard and not connection.closed:
+                try:
+                    connection.rollback()
+                except Exception:
+                    discard = True
+            if discard or connection.closed:
+                self._discard(connection)
+            else:
+                with self._condition:
+                    self._idle.append(connection)
+        finally:
+            self._release_slot()
+
+    def fill(self):
+        """
+        Opens connections until min_size of them are idle.
+        """
+        while len(self._idle) < min(self.min_size, self.max_size):
+            connection = self.connect()
+            with self._condition:
+                self.stats["connections_opened"] += 1
+                self._idle.append(connection)
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self.stats["connections_closed"] += 1
+
+    def get_stats(self):
+        with self._condition:
+            stats = dict(self.stats)
+            idle = len(self._idle)
+            in_use = self._in_use
+            waiting = len(self._waiters)
+        stats["wait_time_ms"] = round(stats["wait_time_ms"], 3)
+        stats["open_connections"] = (
+            stats["connections_opened"] - stats["connections_closed"]
+        )
+        stats["idle_connections"] = idle
+        stats["in_use_connections"] = in_use
+        stats["waiting"] = waiting
+        stats["min_size"] = self.min_size
+        stats["max_size"] = self.max_size
+        return stats
@@ -0,0 +1,18 @@
+import os
+
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from db_pool.base import get_pool_stats
+from permissions import IsAdmin
+
+
+class DatabasePoolStatsAPIView(APIView):
+    """
+    Connection pool counters of the worker process that handled the request.
+    """
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response({"pid": os.getpid(), "pools": get_pool_stats()})
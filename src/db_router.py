@@ -0,0 +1,138 @@
+"""
+Routes the reads of safe requests to the read replicas and everything else to the primary.
+
+ReplicaRoutingMiddleware (see middleware.py) picks a replica for each GET, HEAD and OPTIONS
+request unless the client wrote recently, and ReplicaRouter sends that request's reads to it.
+Writes, reads of other requests and code running outside requests, such as management
+commands, always use the primary.
+"""
+
+import hashlib
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger("db_router")
+
+# Replica the reads of the current request go to, or None to read from the primary
+read_replica: ContextVar[Optional[str]] = ContextVar("read_replica", default=None)
+
+# Cookie holding the time until which the client reads from the primary
+STICKY_COOKIE = "primary_until"
+
+# Apps whose rows are used by the very next request after being written, e.g. a token
+# right after logging in. Their reads are cached or rare, so they stay on the primary.
+PRIMARY_APPS = {"authtoken", "sessions"}
+
+# Replicas that failed, with the monotonic time they are tried again at
+_unavailable_until: dict[str, float] = {}
+
+
+@contextmanager
+def use_primary():
+    """
+    Sends the reads made inside the block to the primary.
+    """
+    token = read_replica.set(None)
+    try:
+        yield
+    finally:
+        read_replica.reset(token)
+
+
+def sticky_cache_key(credentials: str) -> str:
+    digest = hashlib.sha256(credentials.encode()).hexdigest()
+    return f"db:sticky:{digest}"
+
+
+def choose_replica() -> Optional[str]:
+    """
+    Returns a random replica that isn't marked unavailable, or None if there is none.
+    """
+    now = time.monotonic()
+    replicas = [
+        alias
+        for alias in settings.REPLICA_DATABASES
+        if _unavailable_until.get(alias, 0) <= now
+    ]
+    return random.choice(replicas) if replicas else None
+
+
+def mark_unavailable(alias: str) -> None:
+    _unavailable_until[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+    logger.warning(
+        "Replica %s is unavailable, reading from the primary for %.0fs",
+        alias,
+        settings.REPLICA_RETRY_SECONDS,
+    )
+
+
+def is_available(alias: str) -> bool:
+    """
+    Connects to the replica if needed; a replica that can't be connected to is marked unavailable.
+    """
+    if _unavailable_until.get(alias, 0) > time.monotonic():
+        return False
+    connection = connections[alias]
+    try:
+        # Django checks persistent connections on their first query of a request, which
+        # is too late to fail over, so the check runs here
+        connection.close_if_health_check_failed()
+        connection.ensure_connection()
+    except DatabaseError:
+        mark_unavailable(alias)
+        return False
+    return True
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = read_replica.get()
+        if (
+            alias is None
+            or model._meta.app_label in PRIMARY_APPS
+            or not is_available(alias)
+        ):
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def detect_lost_replica(execute, sql, params, many, context):
+    """
+    Marks the replica unavailable when its connection breaks during a query, so the
+    following requests read from the primary. Errors such as cancelled queries don't count.
+    """
+    try:
+        return execute(sql, params, many, context)
+    except DatabaseError:
+        connection = context["connection"]
+        if connection.connection is None or connection.connection.closed:
+            mark_unavailable(connection.alias)
+        raise
+
+
+@receiver(connection_created)
+def install_lost_replica_detector(sender, connection, **kwargs):
+    if (
+        connection.alias in settings.REPLICA_DATABASES
+        and detect_lost_replica not in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(detect_lost_replica)
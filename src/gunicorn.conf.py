@@ -0,0 +1,61 @@
+"""
+Gunicorn configuration for serving the project in production.
+
+Every setting can be overridden with an environment variable, e.g. WEB_CONCURRENCY
+for the number of workers. Set GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker
+to serve asgi.py instead of wsgi.py.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+wsgi_app = "asgi:application" if "uvicorn" in worker_class else "wsgi:application"
+
+# The usual (2 x cores) + 1 keeps every core busy while some workers wait on I/O.
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+
+# Load Django once in the master so forked workers share its memory pages.
+preload_app = True
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers periodically to bound memory growth, with jitter to avoid restarting all at once.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+# Workers write their metrics to files in this directory, aggregated by the /metrics endpoint.
+# It must be set before the app imports prometheus_client.
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-metrics"
+)
+
+
+def on_starting(server):
+    from django.conf import settings
+
+    # Cache invalidation done by one worker must reach the others
+    if server.cfg.workers > 1 and not settings.SHARED_CACHE:
+        raise RuntimeError(
+            f"{server.cfg.workers} workers need a shared cache; set CACHE_BACKEND to "
+            "a backend such as Redis or Memcached, or WEB_CONCURRENCY=1."
+        )
+    # Drop the metrics of a previous run
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
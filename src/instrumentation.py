@@ -0,0 +1,86 @@
+import heapq
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Metrics of the request being handled, set only for sampled requests
+current_metrics: ContextVar[Optional["RequestMetrics"]] = ContextVar(
+    "current_metrics", default=None
+)
+
+
+class RequestMetrics:
+    """
+    Timings collected while handling a single request.
+    Spans of the same name are added up; they may overlap, e.g. lazily evaluated
+    querysets count towards both "db" and the span that evaluated them.
+    """
+
+    def __init__(self, slow_queries_kept: int = 0):
+        self.spans: dict[str, float] = {}
+        self.query_count = 0
+        self.db_time = 0.0
+        self.slow_queries_kept = slow_queries_kept
+        # Min-heap of (duration, sql) holding the slowest queries
+        self.slow_queries: list[tuple[float, str]] = []
+        # Set by the middleware around the view and the rendering of its response
+        self.view_started: Optional[float] = None
+        self.render_started: Optional[float] = None
+
+    def add_span(self, name: str, duration: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + duration
+
+    def add_query(self, duration: float, sql: str) -> None:
+        self.query_count += 1
+        self.db_time += duration
+        if self.slow_queries_kept:
+            # Statements are kept without their parameters, so no user data is logged
+            if len(self.slow_queries) < self.slow_queries_kept:
+                heapq.heappush(self.slow_queries, (duration, sql))
+            elif duration > self.slow_queries[0][0]:
+                heapq.heapreplace(self.slow_queries, (duration, sql))
+
+    def get_slowest_queries(self) -> list[tuple[float, str]]:
+        return sorted(self.slow_queries, reverse=True)
+
+
+@contextmanager
+def timed(name: str):
+    """
+    Adds the time spent in the block to the named span of the current request, if it's sampled.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_span(name, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper adding the queries of sampled requests to their metrics.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(time.perf_counter() - started, sql)
+
+
+# Connections are per thread and async views query from another thread than the
+# middleware's, so every connection records the queries of the request in its context.
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,68 @@
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from instrumentation import RequestMetrics
+
+# Methods other than these are counted as "other", so clients can't add label values
+KNOWN_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+# Route label of requests that didn't match any URL pattern
+UNMATCHED_ROUTE = "unmatched"
+
+REQUESTS = Counter(
+    "http_requests",
+    "Handled requests.",
+    ("route", "method", "status"),
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle a request, until the response body starts.",
+    ("route", "method"),
+)
+# Only observed for requests sampled by the instrumentation
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL queries run by a sampled request.",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL queries by a sampled request.",
+    ("route",),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests being handled by a view.",
+    ("route",),
+    multiprocess_mode="livesum",
+)
+
+
+def get_route(request) -> str:
+    resolver_match = request.resolver_match
+    if resolver_match is None:
+        return UNMATCHED_ROUTE
+    return resolver_match.view_name
+
+
+def request_started(request) -> None:
+    """
+    Called once the view of the request is resolved.
+    """
+    REQUESTS_IN_FLIGHT.labels(get_route(request)).inc()
+
+
+def request_finished(
+    request, response, metrics: Optional[RequestMetrics], duration: float
+) -> None:
+    route = get_route(request)
+    if request.resolver_match is not None:
+        REQUESTS_IN_FLIGHT.labels(route).dec()
+
+    method = request.method if request.method in KNOWN_METHODS else "other"
+    REQUESTS.labels(route, method, response.status_code).inc()
+    REQUEST_DURATION.labels(route, method).observe(duration)
+    if metrics is not None:
+        REQUEST_DB_QUERIES.labels(route).observe(metrics.query_count)
+        REQUEST_DB_DURATION.labels(route).observe(metrics.db_time)
@@ -0,0 +1,44 @@
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views import View
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+
+
+def get_registry():
+    """
+    Returns the registry aggregating the metrics of every worker process when
+    PROMETHEUS_MULTIPROC_DIR is set (see gunicorn.conf.py), or of this process otherwise.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
+
+
+class MetricsView(View):
+    """
+    Exposes the metrics in the Prometheus text format to scrapers sending METRICS_TOKEN
+    as a bearer token. The endpoint doesn't exist while METRICS_TOKEN isn't set.
+    """
+
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        if not token:
+            raise Http404
+        if not constant_time_compare(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        ):
+            return HttpResponse(status=401)
+        return HttpResponse(
+            generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+        )
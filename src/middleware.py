@@ -0,0 +1,259 @@
+import logging
+import math
+import random
+import time
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from whitenoise import middleware as whitenoise
+
+from db_router import STICKY_COOKIE, choose_replica, read_replica, sticky_cache_key
+from instrumentation import RequestMetrics, current_metrics
+from metrics.collectors import request_finished, request_started
+
+logger = logging.getLogger("instrumentation")
+
+
+class WhiteNoiseMiddleware(whitenoise.WhiteNoiseMiddleware):
+    """
+    WhiteNoise middleware that also runs natively under ASGI.
+    The stock middleware is sync-only, which makes Django run every ASGI request,
+    async views included, in a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            # Opening the file is blocking I/O, so it's kept off the event loop
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class InstrumentationMiddleware:
+    """
+    Measures every request and adds a Server-Timing header with its total time, sent to staff
+    and admins only unless SERVER_TIMING_HEADER is set. For a sampled share of requests it
+    also records the SQL query count and database time, the view and render time, and the
+    spans timed by the code (see instrumentation.timed).
+    Requests slower than the threshold are logged with their slowest statements.
+    Every request is also counted in the Prometheus metrics (see metrics.collectors).
+    Streaming responses are measured until their body starts.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        self.slow_request_threshold = settings.SLOW_REQUEST_THRESHOLD_MS / 1000
+        self.slow_queries_logged = settings.SLOW_REQUEST_QUERIES_LOGGED
+        self.server_timing = settings.SERVER_TIMING_HEADER
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django runs sync hooks of async middleware in a thread, so use the async ones
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        metrics = self.sample()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        self.report(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        metrics = self.sample()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        self.report(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    def sample(self) -> Optional[RequestMetrics]:
+        if random.random() >= self.sample_rate:
+            return None
+        return RequestMetrics(slow_queries_kept=self.slow_queries_logged)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.start_view(request)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.start_view(request)
+
+    def process_template_response(self, request, response):
+        # Called when the view returned a response that is rendered next, e.g. a DRF Response
+        self.start_render()
+        return response
+
+    async def aprocess_template_response(self, request, response):
+        self.start_render()
+        return response
+
+    @staticmethod
+    def start_view(request) -> None:
+        request_started(request)
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+
+    @staticmethod
+    def start_render() -> None:
+        metrics = current_metrics.get()
+        if metrics is not None and metrics.view_started is not None:
+            metrics.render_started = time.perf_counter()
+            metrics.add_span("view", metrics.render_started - metrics.view_started)
+
+    def report(
+        self, request, response, metrics: Optional[RequestMetrics], duration: float
+    ) -> None:
+        if metrics is not None:
+            finished = time.perf_counter()
+            if metrics.render_started is not None:
+                metrics.add_span("render", finished - metrics.render_started)
+            elif metrics.view_started is not None:
+                metrics.add_span("view", finished - metrics.view_started)
+
+        request_finished(request, response, metrics, duration)
+        if self.server_timing or self.is_staff(request):
+            response["Server-Timing"] = self.get_server_timing(metrics, duration)
+        if duration >= self.slow_request_threshold:
+            self.log_slow_request(request, response, metrics, duration)
+
+    @staticmethod
+    def is_staff(request) -> bool:
+        # DRF sets the user authenticated by the view on the Django request too.
+        # Both fields are cached with the token (see authentication.CACHED_USER_FIELDS).
+        user = getattr(request, "user", None)
+        return user is not None and (getattr(user, "is_admin", False) or user.is_staff)
+
+    @staticmethod
+    def get_server_timing(metrics: Optional[RequestMetrics], duration: float) -> str:
+        entries = [f"total;dur={duration * 1000:.1f}"]
+        if metrics is not None:
+            entries.append(
+                f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.query_count} queries"'
+            )
+            entries.extend(
+                f"{name};dur={span * 1000:.1f}" for name, span in metrics.spans.items()
+            )
+        return ", ".join(entries)
+
+    @staticmethod
+    def log_slow_request(
+        request, response, metrics: Optional[RequestMetrics], duration: float
+    ) -> None:
+        message = "Slow request: %s %s %s in %.1fms"
+        args = [request.method, request.path, response.status_code, duration * 1000]
+        if metrics is not None:
+            message += ", %d queries in %.1fms"
+            args += [metrics.query_count, metrics.db_time * 1000]
+            for name, span in metrics.spans.items():
+                message += f", {name} %.1fms"
+                args.append(span * 1000)
+            for query_duration, sql in metrics.get_slowest_queries():
+                message += "\n  %.1fms %s"
+                args += [query_duration * 1000, sql]
+        logger.warning(message, *args)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends the reads of GET, HEAD and OPTIONS requests to a read replica (see db_router).
+    After a request with any other method the client reads from the primary for
+    REPLICA_STICKINESS_SECONDS, so it sees its own writes despite the replication lag.
+    Browsers are recognized by a cookie, API clients that don't keep cookies by their
+    Authorization header.
+    """
+
+    sync_capable = True
+    async_capable = True
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.stickiness = settings.REPLICA_STICKINESS_SECONDS
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        credentials = request.headers.get("Authorization")
+        if request.method not in self.safe_methods:
+            response = self.get_response(request)
+            if credentials:
+                cache.set(sticky_cache_key(credentials), True, self.stickiness)
+            self.set_cookie(response)
+            return response
+
+        sticky = self.has_cookie(request) or (
+            credentials is not None and cache.get(sticky_cache_key(credentials))
+        )
+        token = read_replica.set(None if sticky else choose_replica())
+        try:
+            return self.get_response(request)
+        finally:
+            read_replica.reset(token)
+
+    async def __acall__(self, request):
+        credentials = request.headers.get("Authorization")
+        if request.method not in self.safe_methods:
+            response = await self.get_response(request)
+            if credentials:
+                await cache.aset(sticky_cache_key(credentials), True, self.stickiness)
+            self.set_cookie(response)
+            return response
+
+        sticky = self.has_cookie(request) or (
+            credentials is not None and await cache.aget(sticky_cache_key(credentials))
+        )
+        token = read_replica.set(None if sticky else choose_replica())
+        try:
+            return await self.get_response(request)
+        finally:
+            read_replica.reset(token)
+
+    @staticmethod
+    def has_cookie(request) -> bool:
+        try:
+            return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def set_cookie(self, response) -> None:
+        # The cookie only ever makes its owner read from the primary, so it isn't signed
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(math.ceil(time.time() + self.stickiness)),
+            max_age=self.stickiness,
+            httponly=True,
+            samesite="Lax",
+        )
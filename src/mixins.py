@@ -3,11 +3,24 @@ from store import models as app_models
 
 
 class DiscountPriceMixin:
+    # Lookups read by the row-based method fields of the fast read path
+    row_method_sources = {"discounted_price": ("discounted_price", "discount")}
+
     @staticmethod
     def get_discounted_price(obj: app_models.Product) -> Optional[float]:
         """
-        Calculates the discounted price of a product.
+        Returns the discounted price of a product computed by the database.
+        It's a float, as the JSON renderers would convert the Decimal anyway.
         """
         if obj.discount:
-            return obj.price - (obj.price * obj.discount / 100)
+            return float(obj.discounted_price)
+        return None
+
+    @staticmethod
+    def get_discounted_price_from_row(row: dict) -> Optional[float]:
+        """
+        Returns the discounted price of a product from a values() row.
+        """
+        if row["discount"]:
+            return float(row["discounted_price"])
         return None
@@ -0,0 +1,20 @@
+from django.contrib import admin
+from orders.models import Order, OrderItem
+
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    fields = ("product", "product_name", "price", "quantity")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "total_price", "created_at")
+    list_filter = ("created_at",)
+    search_fields = ("user__username",)
+    ordering = ("id",)
+    readonly_fields = ("user", "total_price", "created_at")
+    inlines = (OrderItemInline,)
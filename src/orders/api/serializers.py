@@ -0,0 +1,27 @@
+from rest_framework import serializers
+
+
+class CheckoutItemSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class CheckoutSerializer(serializers.Serializer):
+    items = CheckoutItemSerializer(many=True, allow_empty=False)
+
+
+class OrderItemSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField(read_only=True)
+    product_name = serializers.CharField(read_only=True)
+    price = serializers.DecimalField(max_digits=6, decimal_places=2, read_only=True)
+    quantity = serializers.IntegerField(read_only=True)
+
+
+# Serializer for a placed order.
+class OrderSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    total_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    items = OrderItemSerializer(many=True, read_only=True)
+    created_at = serializers.DateTimeField(read_only=True, format="%Y-%m-%d %H:%M")
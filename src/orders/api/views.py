@@ -0,0 +1,134 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Now
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from orders.api.serializers import CheckoutSerializer, OrderSerializer
+from orders.models import Order, OrderItem
+from permissions import IsClient
+from store.api.cache import bump_product_changed_at
+from store.models import Product
+
+CENT = Decimal("0.01")
+
+
+class CheckoutError(Exception):
+    pass
+
+
+class CheckoutAPIView(generics.GenericAPIView):
+    """
+    A view for placing an order.
+    """
+
+    serializer_class = CheckoutSerializer
+    permission_classes = (IsAuthenticated, IsClient)
+
+    @swagger_auto_schema(
+        operation_description="API endpoint for placing an order. Products are charged at their "
+        "discounted price; stock and balance are checked and updated atomically.",
+        request_body=CheckoutSerializer,
+        responses={201: openapi.Response("Order placed.", OrderSerializer)},
+        operation_id="Checkout",
+    )
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Merge repeated products into one line
+        quantities = {}
+        for item in serializer.validated_data["items"]:
+            product_id = item["product_id"]
+            quantities[product_id] = quantities.get(product_id, 0) + item["quantity"]
+
+        try:
+            order, items = self.place_order(request.user, quantities)
+        except CheckoutError as error:
+            return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Only the detail responses of the ordered products show their stock
+        bump_product_changed_at(quantities)
+        data = {
+            "id": order.id,
+            "total_price": order.total_price,
+            "items": items,
+            "created_at": order.created_at,
+        }
+        return Response(OrderSerializer(data).data, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    @transaction.atomic
+    def place_order(user, quantities: dict[int, int]) -> tuple[Order, list[OrderItem]]:
+        """
+        Debits the balance and decrements stock with conditional UPDATEs instead of
+        locking and re-reading the rows, so an order fails rather than overselling.
+        The stock UPDATE also checks that the prices are still the ones charged, so a
+        product repriced during the checkout fails the order rather than charging the old price.
+        """
+        products = {
+            product["id"]: product
+            for product in Product.objects.filter(
+                id__in=quantities, available=True
+            ).values("id", "name", "discounted_price")
+        }
+        if len(products) != len(quantities):
+            raise CheckoutError("Some of the products don't exist or aren't available.")
+
+        items = [
+            OrderItem(
+                product_id=product_id,
+                product_name=products[product_id]["name"],
+                price=products[product_id]["discounted_price"].quantize(
+                    CENT, rounding=ROUND_HALF_UP
+                ),
+                quantity=quantity,
+            )
+            for product_id, quantity in sorted(quantities.items())
+        ]
+        total_price = sum(item.price * item.quantity for item in items)
+
+        debited = (
+            get_user_model()
+            .objects.filter(pk=user.pk, balance__gte=total_price)
+            .update(balance=F("balance") - total_price)
+        )
+        if not debited:
+            raise CheckoutError("Insufficient balance.")
+
+        order = Order.objects.create(user_id=user.pk, total_price=total_price)
+        for item in items:
+            item.order = order
+        OrderItem.objects.bulk_create(items)
+
+        # Stock is updated last, so the row locks on popular products are held the shortest.
+        # A single statement decrements every line; it matches fewer rows when any is short
+        # or was repriced since it was read.
+        charged_prices = Q()
+        in_stock = Q()
+        for item in items:
+            charged_prices |= Q(
+                id=item.product_id,
+                discounted_price=products[item.product_id]["discounted_price"],
+            )
+            in_stock |= Q(id=item.product_id, quantity__gte=item.quantity)
+        decrement = Case(
+            *(When(id=item.product_id, then=Value(item.quantity)) for item in items)
+        )
+        updated = Product.objects.filter(
+            charged_prices, in_stock, available=True
+        ).update(quantity=F("quantity") - decrement, updated_at=Now())
+        if updated != len(items):
+            if Product.objects.filter(charged_prices).count() != len(items):
+                raise CheckoutError(
+                    "The price of some of the products changed, please try again."
+                )
+            raise CheckoutError("Not enough products in stock.")
+        return order, items
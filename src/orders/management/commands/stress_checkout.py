@@ -0,0 +1,126 @@
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+from store.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Places concurrent orders for a single product from many clients through the checkout "
+        "endpoint, then checks that no stock was oversold and every balance matches its orders. "
+        "The data it creates is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=50)
+        parser.add_argument("--orders-per-client", type=int, default=5)
+        parser.add_argument("--quantity", type=int, default=1)
+        parser.add_argument("--stock", type=int, default=100)
+
+    def handle(self, *args, **options):
+        suffix = uuid.uuid4().hex[:8]
+        price = Decimal("10.00")
+        initial_balance = Decimal("1000.00")
+        User = get_user_model()
+
+        category = Category.objects.create(name=f"stress-{suffix}")
+        product = Product.objects.create(
+            name=f"stress-{suffix}",
+            category=category,
+            price=price,
+            cost_price=price,
+            quantity=options["stock"],
+        )
+        users = User.objects.bulk_create(
+            User(
+                username=f"stress-{suffix}-{i}",
+                balance=initial_balance,
+                role=User.CLIENT,
+            )
+            for i in range(options["clients"])
+        )
+        try:
+            placed, rejected, elapsed = self.place_orders(users, product, options)
+            self.check_consistency(users, product, initial_balance, options)
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+            category.delete()
+
+        self.stdout.write(
+            f"{placed} orders placed, {rejected} rejected in {elapsed:.2f}s "
+            f"({(placed + rejected) / elapsed:.0f} checkouts/s), stock {options['stock']}"
+        )
+        self.stdout.write(self.style.SUCCESS("No overselling, balances consistent."))
+
+    def place_orders(self, users, product, options) -> tuple[int, int, float]:
+        url = reverse("order-checkout")
+        payload = {
+            "items": [{"product_id": product.pk, "quantity": options["quantity"]}]
+        }
+        results = {"placed": 0, "rejected": 0, "errors": []}
+        lock = threading.Lock()
+        start = threading.Barrier(len(users))
+
+        def client(user):
+            api_client = APIClient()
+            api_client.force_authenticate(user)
+            start.wait()
+            try:
+                for _ in range(options["orders_per_client"]):
+                    response = api_client.post(url, payload, format="json")
+                    with lock:
+                        if response.status_code == status.HTTP_201_CREATED:
+                            results["placed"] += 1
+                        elif response.status_code == status.HTTP_400_BAD_REQUEST:
+                            results["rejected"] += 1
+                        else:
+                            results["errors"].append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=client, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if results["errors"]:
+            raise CommandError(f"Unexpected responses: {results['errors']}")
+        return results["placed"], results["rejected"], elapsed
+
+    @staticmethod
+    def check_consistency(users, product, initial_balance: Decimal, options) -> None:
+        product.refresh_from_db(fields=["quantity"])
+        sold = OrderItem.objects.filter(product=product).aggregate(sold=Sum("quantity"))
+        sold = sold["sold"] or 0
+        if sold > options["stock"] or product.quantity != options["stock"] - sold:
+            raise CommandError(
+                f"Stock is inconsistent: {sold} sold of {options['stock']}, "
+                f"{product.quantity} left."
+            )
+
+        spent = dict(
+            Order.objects.filter(user__in=users)
+            .values("user")
+            .annotate(spent=Sum("total_price"))
+            .values_list("user", "spent")
+        )
+        for user in get_user_model().objects.filter(pk__in=[user.pk for user in users]):
+            if user.balance != initial_balance - spent.get(user.pk, 0):
+                raise CommandError(
+                    f"Balance of {user.username} is {user.balance}, "
+                    f"expected {initial_balance - spent.get(user.pk, 0)}."
+                )
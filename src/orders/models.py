@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import models
+
+from store.models import Product
+
+
+class Order(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="orders",
+        verbose_name="User",
+    )
+    total_price = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name="Total price"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Create at")
+
+    def __str__(self):
+        return f"Order #{self.pk}"
+
+    class Meta:
+        verbose_name = "Order"
+        verbose_name_plural = "Orders"
+        ordering = ("id",)
+
+
+class OrderItem(models.Model):
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="items", verbose_name="Order"
+    )
+    # Kept as history when the product is deleted, together with its name and price
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name="Product",
+    )
+    product_name = models.CharField(max_length=50, verbose_name="Product name")
+    price = models.DecimalField(
+        max_digits=6, decimal_places=2, verbose_name="Price per unit"
+    )
+    quantity = models.PositiveIntegerField(verbose_name="Quantity")
+
+    def __str__(self):
+        return f"{self.product_name} x {self.quantity}"
+
+    class Meta:
+        verbose_name = "Order item"
+        verbose_name_plural = "Order items"
+        ordering = ("id",)
@@ -0,0 +1,164 @@
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from orders.models import Order, OrderItem
+from store.models import Category, Product
+from users.models import User
+
+
+class CheckoutConcurrencyTests(TransactionTestCase):
+    """
+    Places orders from several threads, each with its own database connection, so the
+    checkouts really run concurrently against committed data.
+    """
+
+    clients = 10
+    orders_per_client = 3
+    stock = 12
+    initial_balance = Decimal("100.00")
+
+    def setUp(self):
+        category = Category.objects.create(name="Checkout")
+        self.product = Product.objects.create(
+            name="Checkout product",
+            category=category,
+            price=Decimal("10.00"),
+            cost_price=Decimal("9.00"),
+            quantity=self.stock,
+        )
+        self.users = User.objects.bulk_create(
+            User(
+                username=f"client-{number}",
+                balance=self.initial_balance,
+                role=User.CLIENT,
+            )
+            for number in range(self.clients)
+        )
+
+    def checkout(self, user, product_id: int, quantity: int = 1):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(
+            reverse("order-checkout"),
+            {"items": [{"product_id": product_id, "quantity": quantity}]},
+            format="json",
+        )
+
+    def run_in_thread(self, function, *args):
+        def target():
+            try:
+                function(*args)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        return thread
+
+    def test_concurrent_checkouts_dont_oversell(self):
+        statuses = []
+        lock = threading.Lock()
+        start = threading.Barrier(self.clients)
+
+        def place_orders(user):
+            start.wait()
+            for _ in range(self.orders_per_client):
+                response = self.checkout(user, self.product.pk)
+                with lock:
+                    statuses.append(response.status_code)
+
+        threads = [self.run_in_thread(place_orders, user) for user in self.users]
+        for thread in threads:
+            thread.join()
+
+        placed = statuses.count(status.HTTP_201_CREATED)
+        rejected = statuses.count(status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(placed + rejected, len(statuses))
+        # Demand exceeds the stock, which must be sold out exactly
+        self.assertEqual(placed, self.stock)
+        self.product.refresh_from_db(fields=["quantity"])
+        self.assertEqual(self.product.quantity, 0)
+        sold = OrderItem.objects.filter(product=self.product).aggregate(
+            sold=Sum("quantity")
+        )["sold"]
+        self.assertEqual(sold, self.stock)
+
+        spent = dict(
+            Order.objects.values("user")
+            .annotate(spent=Sum("total_price"))
+            .values_list("user", "spent")
+        )
+        for user in User.objects.filter(pk__in=[user.pk for user in self.users]):
+            self.assertEqual(user.balance, self.initial_balance - spent.get(user.pk, 0))
+
+    def test_product_repriced_during_checkout(self):
+        create_order = Order.objects.create
+
+        def create_order_and_reprice(**kwargs):
+            # Commits a new price from another connection after the checkout read the price
+            self.run_in_thread(
+                lambda: Product.objects.filter(pk=self.product.pk).update(
+                    price=Decimal("20.00")
+                )
+            ).join()
+            return create_order(**kwargs)
+
+        user = self.users[0]
+        with mock.patch.object(Order.objects, "create", create_order_and_reprice):
+            response = self.checkout(user, self.product.pk)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+        user.refresh_from_db(fields=["balance"])
+        self.assertEqual(user.balance, self.initial_balance)
+        self.product.refresh_from_db(fields=["quantity"])
+        self.assertEqual(self.product.quantity, self.stock)
+
+
+class CheckoutCacheTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Checkout")
+        cls.product = Product.objects.create(
+            name="Checkout product",
+            category=category,
+            price=Decimal("10.00"),
+            cost_price=Decimal("9.00"),
+            quantity=5,
+        )
+        cls.user = User.objects.create(
+            username="client", balance=Decimal("100.00"), role=User.CLIENT
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_checkout_refreshes_only_the_ordered_products(self):
+        list_url = reverse("products-search-list")
+        detail_url = reverse("products-search-detail", args=[self.product.pk])
+        self.client.get(list_url)
+        self.assertEqual(self.client.get(detail_url).data["quantity"], 5)
+
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("order-checkout"),
+                {"items": [{"product_id": self.product.pk, "quantity": 2}]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.force_authenticate(None)
+
+        self.assertEqual(self.client.get(detail_url).data["quantity"], 3)
+        # Lists don't show stock, so they stay cached
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(list_url).status_code, status.HTTP_200_OK)
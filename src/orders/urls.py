@@ -0,0 +1,20 @@
+from django.urls import path, include
+
+from orders.api.views import CheckoutAPIView
+
+API_PREFIX = "v1/"
+
+urlpatterns = [
+    path(
+        API_PREFIX,
+        include(
+            [
+                path(
+                    "orders/checkout/",
+                    CheckoutAPIView.as_view(),
+                    name="order-checkout",
+                ),
+            ]
+        ),
+    )
+]
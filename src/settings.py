@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 from config.constants import DEFAULT_PAGINATION_SIZE
@@ -37,10 +38,13 @@ INSTALLED_APPS = [
     "djoser",
     "store.apps.StoreConfig",
     "users.apps.UsersConfig",
+    "orders.apps.OrdersConfig",
 ]
 
 MIDDLEWARE = [
+    "middleware.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -49,6 +53,33 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Share of requests whose queries and spans are instrumented, from 0 to 1
+INSTRUMENTATION_SAMPLE_RATE = float(os.getenv("INSTRUMENTATION_SAMPLE_RATE", 0.1))
+# Requests slower than this are logged, with their slowest SQL statements if sampled
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", 500))
+SLOW_REQUEST_QUERIES_LOGGED = int(os.getenv("SLOW_REQUEST_QUERIES_LOGGED", 3))
+# The Server-Timing header reveals query counts and timings, so by default only staff
+# and admins get it; set SERVER_TIMING=true to send it to every client, e.g. for benchmarks
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Bearer token required to scrape /metrics, which is disabled when it's not set
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "instrumentation": {"handlers": ["console"], "level": "INFO"},
+        "db_router": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 ROOT_URLCONF = "urls"
 
 TEMPLATES = [
@@ -71,16 +102,58 @@ WSGI_APPLICATION = "wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+# DB_POOL=true checks connections out of a per-process pool (see db_pool/base.py);
+# otherwise DB_CONN_MAX_AGE keeps each thread's connection open between requests.
+# Under ASGI every request runs its queries in a new context, so persistent
+# connections aren't reused there; use the pool to bound connections instead.
+DB_POOL = os.getenv("DB_POOL", "false").lower() in ("1", "true", "yes")
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "db_pool" if DB_POOL else "django.db.backends.postgresql",
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST"),
         "PORT": os.getenv("POSTGRES_PORT"),
+        # Pooled connections are returned to the pool at the end of every request
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower()
+        in ("1", "true", "yes"),
+        "POOL": {
+            "MIN_SIZE": int(os.getenv("DB_POOL_MIN_SIZE", 0)),
+            "MAX_SIZE": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+        },
     }
 }
+
+# Read replicas of the default database, as comma-separated host[:port] entries with the
+# same name and credentials, e.g. POSTGRES_REPLICA_HOSTS=replica1,replica2:5433.
+# Reads of GET, HEAD and OPTIONS requests go to a replica (see db_router.py) unless the
+# client wrote within the last REPLICA_STICKINESS_SECONDS; everything else uses the primary.
+# A replica that can't be connected to is skipped for REPLICA_RETRY_SECONDS.
+REPLICA_DATABASES = []
+for number, address in enumerate(
+    filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",")), start=1
+):
+    host, _, port = address.strip().partition(":")
+    alias = f"replica{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        # Fail over quickly instead of waiting for an unreachable host
+        "OPTIONS": {"connect_timeout": int(os.getenv("DB_REPLICA_CONNECT_TIMEOUT", 2))},
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+REPLICA_STICKINESS_SECONDS = float(os.getenv("REPLICA_STICKINESS_SECONDS", 5))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", 30))
+if REPLICA_DATABASES:
+    DATABASE_ROUTERS = ["db_router.ReplicaRouter"]
+    # Right after the instrumentation, before any middleware that reads the database
+    MIDDLEWARE.insert(1, "middleware.ReplicaRoutingMiddleware")
 # DATABASES = {
 #     "default": {
 #         "ENGINE": "django.db.backends.sqlite3",
@@ -88,6 +161,32 @@ DATABASES = {
 #     }
 # }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The local-memory backend is per process, so it only suits a single process such as
+# runserver. Catalog cache invalidation must reach every worker, so gunicorn refuses
+# to start several workers without a shared backend (see gunicorn.conf.py), e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and
+# CACHE_LOCATION=redis://redis:6379/0 as in docker-compose.yml.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+# Whether every process sees the same cache entries
+SHARED_CACHE = (
+    CACHES["default"]["BACKEND"] != "django.core.cache.backends.locmem.LocMemCache"
+)
+# Replica stickiness of API clients is kept in the cache and must reach every worker
+if REPLICA_DATABASES and not SHARED_CACHE:
+    raise ImproperlyConfigured(
+        "Read replicas need a shared cache; set CACHE_BACKEND to a backend such as "
+        "Redis or Memcached."
+    )
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -122,6 +221,16 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "static/")
+# Static files are collected at image build time and served by WhiteNoise
+# with compressed, content-hashed names that can be cached forever.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
@@ -132,9 +241,25 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "users.User"
+# Render and parse JSON with orjson; set to false to use the stdlib json module
+FAST_JSON = os.getenv("FAST_JSON", "true").lower() in ("1", "true", "yes")
+
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": (
+        "store.api.renderers.ORJSONRenderer"
+        if FAST_JSON
+        else "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "store.api.parsers.ORJSONParser"
+        if FAST_JSON
+        else "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
@@ -150,5 +275,14 @@ SWAGGER_SETTINGS = {
         "DEFAULT_INFO": "src.urls.app_info",
         "Basic": {"type": "basic"},
         "Bearer": {"type": "apiKey", "name": "Authorization", "in": "header"},
-    }
+    },
+    # The UIs load the precomputed schema instead of generating it themselves
+    "SPEC_URL": ("schema-json", {"format": ".json"}),
 }
+
+REDOC_SETTINGS = {
+    "SPEC_URL": ("schema-json", {"format": ".json"}),
+}
+
+# Directory of the prebuilt OpenAPI schema (see api_schema.py)
+OPENAPI_SCHEMA_DIR = os.getenv("OPENAPI_SCHEMA_DIR", os.path.join(BASE_DIR, "openapi"))
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from store.api.cache import bump_catalog_version
 from store.models import Category, Product
 
 
@@ -49,3 +50,12 @@ class ProductAdmin(admin.ModelAdmin):
         ),
     )
     readonly_fields = ("created_at", "updated_at")
+
+    # Product deletions don't send signals to the catalog cache
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_catalog_version()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump_catalog_version()
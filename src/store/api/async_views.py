@@ -0,0 +1,146 @@
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from instrumentation import timed
+from store.api.cache import acache_catalog_response, aget_category_ids_by_name
+from store.api.fast_serializers import get_fast_serializer
+from store.api.filters import ProductFilter
+from store.api.serializers import (
+    CategorySerializer,
+    ProductDetailSerializer,
+    ProductSearchSerializer,
+)
+from store.models import Category, Product
+
+
+class AsyncCatalogView(View):
+    """
+    Base class for async read-only catalog views served natively under ASGI.
+    Responses are rendered like the DRF views they mirror, using the fast read path.
+    Under WSGI Django runs them in an event loop per request, so prefer the sync views there.
+    """
+
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    page_size = api_settings.PAGE_SIZE
+    page_query_param = "page"
+
+    def render(self, data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+        with timed("render"):
+            content = self.renderer.render(data)
+        return HttpResponse(
+            content, content_type="application/json", status=status_code
+        )
+
+    async def paginate(
+        self, request, queryset: QuerySet, fast_serializer
+    ) -> HttpResponse:
+        """
+        Renders a page in the same format as rest_framework's PageNumberPagination.
+        """
+        count = await queryset.acount()
+        num_pages = max(1, -(-count // self.page_size))
+        page_number = request.GET.get(self.page_query_param) or 1
+        if page_number == "last":
+            page_number = num_pages
+        try:
+            page_number = int(page_number)
+        except (TypeError, ValueError):
+            page_number = 0
+        if not 1 <= page_number <= num_pages:
+            return self.render({"detail": "Invalid page."}, status.HTTP_404_NOT_FOUND)
+
+        offset = (page_number - 1) * self.page_size
+        rows = [row async for row in queryset[offset : offset + self.page_size]]
+
+        url = request.build_absolute_uri()
+        next_url = previous_url = None
+        if page_number < num_pages:
+            next_url = replace_query_param(url, self.page_query_param, page_number + 1)
+        if page_number == 2:
+            previous_url = remove_query_param(url, self.page_query_param)
+        elif page_number > 2:
+            previous_url = replace_query_param(
+                url, self.page_query_param, page_number - 1
+            )
+
+        return self.render(
+            {
+                "count": count,
+                "next": next_url,
+                "previous": previous_url,
+                "results": fast_serializer.serialize(rows),
+            }
+        )
+
+
+class AsyncProductSearchMixin:
+    cache_query_params = (*ProductFilter.base_filters, "page")
+
+    async def get_filterset(self, request) -> ProductFilter:
+        # Category names are resolved before filtering, as the filter can't query the database here
+        category_ids = None
+        if "category" in request.GET:
+            category_ids = await aget_category_ids_by_name()
+        return ProductFilter(
+            request.GET,
+            queryset=Product.objects.all(),
+            request=request,
+            category_ids=category_ids,
+        )
+
+
+class AsyncProductSearchListView(AsyncProductSearchMixin, AsyncCatalogView):
+    """
+    Async version of the product search list with page number pagination.
+    """
+
+    @acache_catalog_response
+    async def get(self, request):
+        filterset = await self.get_filterset(request)
+        if not filterset.is_valid():
+            return self.render(filterset.errors, status.HTTP_400_BAD_REQUEST)
+
+        fast_serializer = get_fast_serializer(ProductSearchSerializer)
+        queryset = filterset.qs.values(*fast_serializer.lookups)
+        return await self.paginate(request, queryset, fast_serializer)
+
+
+class AsyncProductSearchDetailView(AsyncProductSearchMixin, AsyncCatalogView):
+    """
+    Async version of the product search detail.
+    """
+
+    @acache_catalog_response
+    async def get(self, request, pk):
+        filterset = await self.get_filterset(request)
+        if not filterset.is_valid():
+            return self.render(filterset.errors, status.HTTP_400_BAD_REQUEST)
+
+        fast_serializer = get_fast_serializer(ProductDetailSerializer)
+        queryset = filterset.qs.values(*fast_serializer.lookups)
+        try:
+            row = await queryset.aget(pk=pk)
+        except Product.DoesNotExist:
+            return self.render(
+                {"detail": "No Product matches the given query."},
+                status.HTTP_404_NOT_FOUND,
+            )
+        return self.render(fast_serializer.to_representation(row))
+
+
+class AsyncCategorySearchView(AsyncCatalogView):
+    """
+    Async version of the category list.
+    """
+
+    cache_query_params = ("page",)
+
+    @acache_catalog_response
+    async def get(self, request):
+        fast_serializer = get_fast_serializer(CategorySerializer)
+        queryset = Category.objects.values(*fast_serializer.lookups)
+        return await self.paginate(request, queryset, fast_serializer)
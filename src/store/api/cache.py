@@ -0,0 +1,220 @@
+import hashlib
+import json
+import time
+from contextlib import nullcontext
+from functools import wraps
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from config.constants import CATALOG_CACHE_TIMEOUT
+from db_router import read_replica, use_primary
+from store.models import Category
+
+CATALOG_VERSION_KEY = "catalog:version"
+# Time of the last catalog change, which read replicas may not have caught up with yet
+CATALOG_CHANGED_AT_KEY = "catalog:changed-at"
+
+
+def product_changed_at_key(pk) -> str:
+    # Time of the last change of the product that only its detail responses show, e.g. stock
+    return f"catalog:product:{pk}:changed-at"
+
+
+def get_catalog_version() -> int:
+    """
+    Returns the current catalog version, initializing it if the cache has no value yet.
+    """
+    # Seeding with a timestamp keeps versions unique if the counter is ever evicted.
+    return cache.get_or_set(CATALOG_VERSION_KEY, time.time_ns, timeout=None)
+
+
+async def aget_catalog_version() -> int:
+    return await cache.aget_or_set(CATALOG_VERSION_KEY, time.time_ns, timeout=None)
+
+
+def bump_catalog_version() -> None:
+    """
+    Invalidates every cached catalog response once the current transaction commits.
+    """
+
+    def bump():
+        cache.set(CATALOG_CHANGED_AT_KEY, time.time(), timeout=None)
+        try:
+            cache.incr(CATALOG_VERSION_KEY)
+        except ValueError:
+            cache.set(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def bump_product_changed_at(product_ids) -> None:
+    """
+    Invalidates the cached detail responses of the products once the current transaction
+    commits, for changes that lists don't show, such as stock.
+    """
+
+    def bump():
+        changed_at = time.time()
+        cache.set_many(
+            {product_changed_at_key(pk): changed_at for pk in product_ids},
+            timeout=None,
+        )
+
+    transaction.on_commit(bump)
+
+
+def get_product_changed_at(kwargs: dict):
+    """
+    Returns the time of the last change of the product of a detail view, or None.
+    """
+    return cache.get(product_changed_at_key(kwargs["pk"])) if "pk" in kwargs else None
+
+
+async def aget_product_changed_at(kwargs: dict):
+    if "pk" not in kwargs:
+        return None
+    return await cache.aget(product_changed_at_key(kwargs["pk"]))
+
+
+def is_replica_lagging(changed_at) -> bool:
+    return (
+        changed_at is not None
+        and time.time() - changed_at < settings.REPLICA_STICKINESS_SECONDS
+    )
+
+
+def fresh_reads(product_changed_at=None):
+    """
+    Returns a context manager that reads from the primary while read replicas may lag
+    behind the last catalog change, or the last change of the product being cached,
+    so responses cached under the new catalog version don't hold the old rows.
+    """
+    if read_replica.get() is not None and (
+        is_replica_lagging(product_changed_at)
+        or is_replica_lagging(cache.get(CATALOG_CHANGED_AT_KEY))
+    ):
+        return use_primary()
+    return nullcontext()
+
+
+async def afresh_reads(product_changed_at=None):
+    if read_replica.get() is not None and (
+        is_replica_lagging(product_changed_at)
+        or is_replica_lagging(await cache.aget(CATALOG_CHANGED_AT_KEY))
+    ):
+        return use_primary()
+    return nullcontext()
+
+
+def get_category_ids_by_name() -> dict[str, int]:
+    """
+    Returns the mapping of category names to ids, cached until the catalog changes.
+    """
+    key = f"catalog:{get_catalog_version()}:category-ids"
+    category_ids = cache.get(key)
+    if category_ids is None:
+        with fresh_reads():
+            category_ids = dict(Category.objects.order_by().values_list("name", "id"))
+        cache.set(key, category_ids, CATALOG_CACHE_TIMEOUT)
+    return category_ids
+
+
+async def aget_category_ids_by_name() -> dict[str, int]:
+    key = f"catalog:{await aget_catalog_version()}:category-ids"
+    category_ids = await cache.aget(key)
+    if category_ids is None:
+        with await afresh_reads():
+            category_ids = {
+                name: category_id
+                async for name, category_id in Category.objects.order_by().values_list(
+                    "name", "id"
+                )
+            }
+        await cache.aset(key, category_ids, CATALOG_CACHE_TIMEOUT)
+    return category_ids
+
+
+def catalog_cache_key(
+    request,
+    view,
+    kwargs: dict,
+    version: Optional[int] = None,
+    exclude: tuple[str, ...] = (),
+    product_changed_at=None,
+) -> str:
+    """
+    Builds a cache key from the request path and the normalized query parameters the view
+    depends on, leaving out the parameters in `exclude`. Keys of product details also
+    change with the product (see bump_product_changed_at).
+    """
+    params = sorted(
+        (name, value.strip())
+        for name in request.GET
+        if name in getattr(view, "cache_query_params", ()) and name not in exclude
+        for value in request.GET.getlist(name)
+        if value.strip()
+    )
+    raw = json.dumps([request.build_absolute_uri(request.path), kwargs, params])
+    digest = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+    if version is None:
+        version = get_catalog_version()
+    return f"catalog:{version}:{product_changed_at}:{digest}"
+
+
+def cache_catalog_response(view_method):
+    """
+    Serves successful responses of a read-only catalog view from the cache.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        product_changed_at = get_product_changed_at(kwargs)
+        key = catalog_cache_key(
+            request, self, kwargs, product_changed_at=product_changed_at
+        )
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        with fresh_reads(product_changed_at):
+            response = view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, CATALOG_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
+
+
+def acache_catalog_response(view_method):
+    """
+    Async counterpart of cache_catalog_response for views returning rendered JSON.
+    The rendered body is cached, so hits skip rendering as well.
+    """
+
+    @wraps(view_method)
+    async def wrapper(self, request, *args, **kwargs):
+        product_changed_at = await aget_product_changed_at(kwargs)
+        key = catalog_cache_key(
+            request,
+            self,
+            kwargs,
+            await aget_catalog_version(),
+            product_changed_at=product_changed_at,
+        )
+        content = await cache.aget(key)
+        if content is not None:
+            return HttpResponse(content, content_type="application/json")
+
+        with await afresh_reads(product_changed_at):
+            response = await view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            await cache.aset(key, response.content, CATALOG_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
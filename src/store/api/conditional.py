@@ -0,0 +1,113 @@
+import hashlib
+from functools import wraps
+from typing import Optional
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.db.models.functions import Greatest
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+
+from config.constants import CATALOG_CACHE_TIMEOUT
+from store.api.cache import (
+    catalog_cache_key,
+    fresh_reads,
+    get_catalog_version,
+    get_product_changed_at,
+)
+from store.api.pagination import ProductCursorPagination
+
+Validators = tuple[Optional[str], Optional[int]]
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.md5(
+        ":".join(str(part) for part in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def detail_validators(view, kwargs: dict) -> Validators:
+    """
+    Returns the ETag and Last-Modified timestamp of a single product from the updated_at
+    of the product and of its category, whose name the product payloads render.
+    """
+    pk = kwargs[view.lookup_url_kwarg or view.lookup_field]
+    updated_at = (
+        view.get_queryset()
+        .filter(pk=pk)
+        .values_list(Greatest("updated_at", "category__updated_at"), flat=True)
+        .first()
+    )
+    if updated_at is None:
+        return None, None
+    return make_etag(pk, updated_at.isoformat()), int(updated_at.timestamp())
+
+
+def list_validators(view, kwargs: dict) -> Validators:
+    """
+    Returns the ETag of a filtered product list from MAX(updated_at) and the row count.
+    Cursor pages skip that aggregate, which scans every matching row, and use the
+    catalog version instead.
+    """
+    # Last-Modified is not sent for lists because it can't reflect deleted rows.
+    if isinstance(view.paginator, ProductCursorPagination):
+        return make_etag("catalog", get_catalog_version()), None
+    summary = (
+        view.filter_queryset(view.get_queryset())
+        .order_by()
+        .aggregate(last_updated=Max("updated_at"), count=Count("pk"))
+    )
+    last_updated = summary["last_updated"]
+    return (
+        make_etag(last_updated.isoformat() if last_updated else "", summary["count"]),
+        None,
+    )
+
+
+def conditional_catalog_response(get_validators):
+    """
+    Answers If-None-Match / If-Modified-Since with 304 before the view renders anything.
+    Validators are cached under the catalog version, so they are recomputed only after writes.
+    They describe the whole filtered list, so all its pages share them.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            product_changed_at = get_product_changed_at(kwargs)
+            key = catalog_cache_key(
+                request,
+                self,
+                kwargs,
+                exclude=getattr(self, "page_query_params", ()),
+                product_changed_at=product_changed_at,
+            )
+            key = f"{key}:validators"
+            validators = cache.get(key)
+            if validators is None:
+                with fresh_reads(product_changed_at):
+                    validators = get_validators(self, kwargs)
+                cache.set(key, validators, CATALOG_CACHE_TIMEOUT)
+            etag, last_modified = validators
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+
+            if response.status_code in (
+                status.HTTP_200_OK,
+                status.HTTP_304_NOT_MODIFIED,
+            ):
+                if etag:
+                    response["ETag"] = etag
+                if last_modified:
+                    response["Last-Modified"] = http_date(last_modified)
+            return response
+
+        return wrapper
+
+    return decorator
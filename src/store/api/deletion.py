@@ -0,0 +1,71 @@
+from typing import Callable, Optional
+
+from django.db import connections, models, transaction
+
+from config.constants import CATEGORY_DELETE_CHUNK_SIZE
+from store.api.cache import bump_catalog_version
+from store.models import Category, Product
+
+
+def delete_products(ids: list[int], using: str = "default") -> None:
+    """
+    Deletes products by id with set-based statements instead of Django's deletion collector,
+    which loads every product into Python when any relation to products isn't fast-deletable.
+    Relations to products must be SET_NULL or DO_NOTHING; post_delete signals aren't sent.
+    """
+    # The relations Django's collector follows, including hidden ones (related_name="+")
+    relations = (
+        field
+        for field in Product._meta.get_fields(include_hidden=True)
+        if field.auto_created
+        and not field.concrete
+        and (field.one_to_one or field.one_to_many)
+    )
+    for relation in relations:
+        if relation.on_delete is models.SET_NULL:
+            relation.related_model._base_manager.using(using).filter(
+                **{f"{relation.field.name}__in": ids}
+            ).update(**{relation.field.name: None})
+        elif relation.on_delete is not models.DO_NOTHING:
+            raise ValueError(
+                f"Products can't be deleted directly while {relation.related_model.__name__} "
+                f"references them with on_delete={relation.on_delete.__name__}."
+            )
+
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {connection.ops.quote_name(Product._meta.db_table)} "
+            "WHERE id = ANY(%s)",
+            [ids],
+        )
+
+
+def delete_category(
+    category: Category,
+    chunk_size: int = CATEGORY_DELETE_CHUNK_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Deletes a category with its products in chunks, each in its own short transaction,
+    so a big category doesn't hold its locks for the whole deletion.
+    Calls progress with the number of products deleted so far after every chunk.
+    Returns the number of deleted products.
+    """
+    using = category._state.db or "default"
+    products = Product._base_manager.using(using).filter(category=category)
+    deleted = 0
+    while ids := list(
+        products.order_by("id").values_list("id", flat=True)[:chunk_size]
+    ):
+        with transaction.atomic(using=using):
+            delete_products(ids, using)
+        deleted += len(ids)
+        if progress:
+            progress(deleted)
+
+    # Products added in the meantime are removed by the cascade
+    category.delete()
+    if deleted:
+        bump_catalog_version()
+    return deleted
@@ -0,0 +1,48 @@
+import csv
+from typing import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Exported columns mapped to the lookups they are read from
+EXPORT_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "category_id": "category_id",
+    "category": "category__name",
+    "price": "price",
+    "cost_price": "cost_price",
+    "quantity": "quantity",
+    "discount": "discount",
+    "available": "available",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+
+class Echo:
+    """
+    An object that implements just the write method of the file-like interface.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS.keys())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows: Iterable[tuple]) -> Iterator[str]:
+    encoder = DjangoJSONEncoder()
+    columns = tuple(EXPORT_FIELDS.keys())
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", iter_csv),
+    "ndjson": ("application/x-ndjson", iter_ndjson),
+}
@@ -0,0 +1,115 @@
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
+
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+
+from instrumentation import timed
+
+Converter = Callable[[Any], Any]
+# Converter factories are called once per serialized batch, so per-request state
+# such as the active timezone is resolved once instead of once per value.
+ConverterFactory = Callable[[], Converter]
+
+
+def datetime_converter(field: serializers.DateTimeField) -> ConverterFactory:
+    output_format = getattr(field, "format", None)
+    if output_format is None or output_format.lower() == ISO_8601:
+        return lambda: field.to_representation
+
+    def make_converter():
+        field_timezone = (
+            field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        )
+
+        def convert(value):
+            if not value:
+                return None
+            if field_timezone is None or not timezone.is_aware(value):
+                return field.to_representation(value)
+            return value.astimezone(field_timezone).strftime(output_format)
+
+        return convert
+
+    return make_converter
+
+
+# Factories equivalent to the fields' to_representation, matched by exact field class
+FIELD_CONVERTERS: dict[type, Callable[[serializers.Field], ConverterFactory]] = {
+    serializers.DateTimeField: datetime_converter,
+    serializers.FloatField: lambda field: lambda: float,
+    serializers.IntegerField: lambda field: lambda: int,
+    serializers.CharField: lambda field: lambda: str,
+}
+
+
+def get_converter_factory(field: serializers.Field) -> ConverterFactory:
+    make_converter_factory = FIELD_CONVERTERS.get(type(field))
+    if make_converter_factory is None:
+        return lambda: field.to_representation
+    return make_converter_factory(field)
+
+
+class FastReadSerializer:
+    """
+    Renders a read-only serializer straight from values() rows.
+    Each field is compiled once into a lookup and a converter, so rendering a row
+    skips attribute resolution and per-field dispatch while producing the same output.
+    Method fields are computed by the serializer's `get_<field>_from_row(row)`, which
+    reads the lookups listed in its `row_method_sources`.
+    """
+
+    def __init__(self, serializer_class: type[serializers.Serializer]):
+        serializer = serializer_class()
+        # (field name, lookup, converter factory); method fields have no lookup
+        # and their converter gets the whole row
+        self.fields = []
+        lookups = {"id"}
+        for field in serializer._readable_fields:
+            if isinstance(field, serializers.SerializerMethodField):
+                method = getattr(serializer, f"get_{field.field_name}_from_row")
+                self.fields.append(
+                    (field.field_name, None, lambda method=method: method)
+                )
+                lookups.update(serializer.row_method_sources[field.field_name])
+            else:
+                lookup = "__".join(field.source_attrs)
+                self.fields.append(
+                    (field.field_name, lookup, get_converter_factory(field))
+                )
+                lookups.add(lookup)
+        self.lookups = tuple(sorted(lookups))
+
+    def get_converters(self) -> list[tuple[str, Optional[str], Converter]]:
+        return [
+            (field_name, lookup, make_converter())
+            for field_name, lookup, make_converter in self.fields
+        ]
+
+    @staticmethod
+    def convert_row(row: dict, converters) -> dict:
+        ret = {}
+        for field_name, lookup, convert in converters:
+            if lookup is None:
+                ret[field_name] = convert(row)
+            else:
+                value = row[lookup]
+                ret[field_name] = None if value is None else convert(value)
+        return ret
+
+    def to_representation(self, row: dict) -> dict:
+        with timed("serialize"):
+            return self.convert_row(row, self.get_converters())
+
+    def serialize(self, rows: Iterable[dict]) -> list[dict]:
+        with timed("serialize"):
+            converters = self.get_converters()
+            convert_row = self.convert_row
+            return [convert_row(row, converters) for row in rows]
+
+
+@lru_cache
+def get_fast_serializer(
+    serializer_class: type[serializers.Serializer],
+) -> FastReadSerializer:
+    return FastReadSerializer(serializer_class)
@@ -1,7 +1,32 @@
+from typing import Optional
+
 import django_filters
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db.models import QuerySet
 from django_filters import rest_framework as filters
+
+from config.constants import PRODUCT_SEARCH_CONFIG
+from store.api.cache import get_category_ids_by_name
 from store.models import Product
 
+SEARCH_MODE_TRIGRAM = "trigram"
+SEARCH_MODE_FULLTEXT = "fulltext"
+
+# Supported orderings, each with the primary key as a tie-breaker
+PRODUCT_ORDERINGS = {
+    "id": ("id",),
+    "-id": ("-id",),
+    "price": ("price", "id"),
+    "-price": ("-price", "-id"),
+    "discounted_price": ("discounted_price", "id"),
+    "-discounted_price": ("-discounted_price", "-id"),
+}
+
 
 class CharFilterInFilter(filters.BaseInFilter, filters.CharFilter):
     pass
@@ -9,8 +34,7 @@ class CharFilterInFilter(filters.BaseInFilter, filters.CharFilter):
 
 class ProductFilter(django_filters.FilterSet):
     category = CharFilterInFilter(
-        field_name="category__name",
-        lookup_expr="in",
+        method="filter_category",
         label="Category (specify one or more categories, separated by commas)",
     )
     min_price = filters.NumberFilter(
@@ -23,12 +47,95 @@ class ProductFilter(django_filters.FilterSet):
         lookup_expr="lte",
         label="Maximum Price (filter products with a price lower than or equal to the specified)",
     )
+    min_discounted_price = filters.NumberFilter(
+        field_name="discounted_price",
+        lookup_expr="gte",
+        label="Minimum Discounted Price (filter products with a price after discount higher than or equal to the specified)",
+    )
+    max_discounted_price = filters.NumberFilter(
+        field_name="discounted_price",
+        lookup_expr="lte",
+        label="Maximum Discounted Price (filter products with a price after discount lower than or equal to the specified)",
+    )
+    available = filters.BooleanFilter(
+        field_name="available",
+        label="Availability (filter products by whether they are available)",
+    )
     name = filters.CharFilter(
-        field_name="name",
-        lookup_expr="icontains",
+        method="filter_name",
         label="Name (enter a part or full name of the product for search)",
     )
+    search_mode = filters.ChoiceFilter(
+        method="filter_search_mode",
+        choices=(
+            (SEARCH_MODE_TRIGRAM, "Substring match ranked by trigram similarity"),
+            (SEARCH_MODE_FULLTEXT, "Full-text match ranked by relevance"),
+        ),
+        label="Search mode for the name filter (trigram by default)",
+    )
+    ordering = filters.ChoiceFilter(
+        method="filter_ordering",
+        choices=[(ordering, ordering) for ordering in PRODUCT_ORDERINGS],
+        label="Ordering (prefix with '-' for descending order)",
+    )
 
     class Meta:
         model = Product
-        fields = ["category", "min_price", "max_price", "name"]
+        fields = [
+            "category",
+            "min_price",
+            "max_price",
+            "min_discounted_price",
+            "max_discounted_price",
+            "available",
+            "name",
+            "search_mode",
+            "ordering",
+        ]
+
+    def __init__(self, *args, category_ids: Optional[dict[str, int]] = None, **kwargs):
+        # Async views pass the category mapping in, as the filter can't query the database there.
+        super().__init__(*args, **kwargs)
+        self.category_ids = category_ids
+
+    def filter_category(
+        self, queryset: QuerySet, name: str, value: list[str]
+    ) -> QuerySet:
+        # Names are resolved to ids up front so the query doesn't join store_category.
+        category_ids = self.category_ids
+        if category_ids is None:
+            category_ids = get_category_ids_by_name()
+        return queryset.filter(
+            category_id__in=[
+                category_ids[category] for category in value if category in category_ids
+            ]
+        )
+
+    def filter_search_mode(self, queryset: QuerySet, name: str, value: str) -> QuerySet:
+        # The search mode only changes how the "name" filter is applied.
+        return queryset
+
+    def filter_ordering(self, queryset: QuerySet, name: str, value: str) -> QuerySet:
+        return queryset.order_by(*PRODUCT_ORDERINGS[value])
+
+    def filter_name(self, queryset: QuerySet, name: str, value: str) -> QuerySet:
+        """
+        Filters products by name and orders them by relevance.
+        Both modes are backed by GIN indexes on the product name.
+        """
+        if self.form.cleaned_data.get("search_mode") == SEARCH_MODE_FULLTEXT:
+            vector = SearchVector("name", config=PRODUCT_SEARCH_CONFIG)
+            query = SearchQuery(
+                value, search_type="websearch", config=PRODUCT_SEARCH_CONFIG
+            )
+            return (
+                queryset.annotate(search=vector, rank=SearchRank(vector, query))
+                .filter(search=query)
+                .order_by("-rank", "id")
+            )
+
+        return (
+            queryset.filter(name__icontains=value)
+            .annotate(similarity=TrigramSimilarity("name", value))
+            .order_by("-similarity", "id")
+        )
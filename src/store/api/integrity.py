@@ -0,0 +1,15 @@
+from typing import Optional
+
+from django.db import IntegrityError
+
+# SQLSTATE codes of the constraint violations the create endpoints report
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def get_sqlstate(error: IntegrityError) -> Optional[str]:
+    """
+    Returns the SQLSTATE code of a database error raised by psycopg2 or psycopg.
+    """
+    cause = error.__cause__
+    return getattr(cause, "pgcode", None) or getattr(cause, "sqlstate", None)
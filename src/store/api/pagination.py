@@ -0,0 +1,187 @@
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Field, Func, Model, QuerySet, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    CursorPagination,
+    PageNumberPagination,
+    _reverse_ordering,
+)
+
+from store.api.filters import PRODUCT_ORDERINGS
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """
+    Returns the planner's row estimate for an unfiltered queryset, falling back to an exact count.
+    """
+    connection = connections[queryset.db]
+    if queryset.query.where or connection.vendor != "postgresql":
+        return queryset.count()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+
+    # reltuples is -1 for tables that have never been analyzed
+    if row is None or row[0] < 0:
+        return queryset.count()
+    return row[0]
+
+
+class RowValue(Func):
+    """
+    A row constructor such as (price, id); row values compare field by field, so
+    (price, id) > (%s, %s) is served by a single range scan of an index on (price, id).
+    """
+
+    template = "(%(expressions)s)"
+    output_field = Field()
+
+
+def get_position_field(model: type[Model], name: str) -> Field:
+    field = model._meta.get_field(name)
+    # Generated fields hold values of their output field
+    return getattr(field, "output_field", None) or field
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self) -> int:
+        return estimate_count(self.object_list)
+
+
+class ProductPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination that can estimate the total count instead of running COUNT(*).
+    """
+
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.count_query_param) == COUNT_ESTIMATE:
+            self.django_paginator_class = EstimatedCountPaginator
+        return super().paginate_queryset(queryset, request, view)
+
+
+class ProductCursorPagination(CursorPagination):
+    """
+    Keyset pagination ordered by one of the product orderings with opaque cursors.
+    The total count is skipped unless explicitly requested.
+
+    DRF's cursors hold the first ordering field and an offset into the rows sharing its
+    value, which turns long runs of equal prices into OFFSET scans. Every product ordering
+    ends with the id and sorts all its fields the same way, so here the cursor holds the
+    whole ordering key and the next page starts right after it, e.g. (price, id) > (%s, %s).
+    """
+
+    ordering = ("id",)
+    ordering_query_param = "ordering"
+    count_query_param = "count"
+    orderings = PRODUCT_ORDERINGS
+    position_separator = ","
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get(self.ordering_query_param)
+        return self.orderings.get(ordering, self.ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        count_mode = request.query_params.get(self.count_query_param)
+        self.count = None
+        if count_mode == COUNT_EXACT:
+            self.count = queryset.count()
+        elif count_mode == COUNT_ESTIMATE:
+            self.count = estimate_count(queryset)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = None if self.cursor is None else self.cursor.position
+
+        queryset = queryset.order_by(
+            *(_reverse_ordering(self.ordering) if reverse else self.ordering)
+        )
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(queryset.model, position, reverse)
+            )
+        # One extra row tells whether another page follows
+        rows = list(queryset[: self.page_size + 1])
+        self.page = rows[: self.page_size]
+        following_position = None
+        if len(rows) > self.page_size:
+            following_position = self._get_position_from_instance(
+                rows[-1], self.ordering
+            )
+
+        if reverse:
+            self.page.reverse()
+            self.next_position, self.previous_position = position, following_position
+        else:
+            self.next_position, self.previous_position = following_position, position
+        self.has_next = self.next_position is not None
+        self.has_previous = self.previous_position is not None
+        self.display_page_controls = self.has_next or self.has_previous
+        return self.page
+
+    def get_position_filter(self, model: type[Model], position: str, reverse: bool):
+        """
+        Returns the condition matching the rows after the position in the page direction.
+        """
+        names = [name.lstrip("-") for name in self.ordering]
+        values = position.split(self.position_separator)
+        if len(values) != len(names):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            values = [
+                Value(field.to_python(value), output_field=field)
+                for field, value in zip(
+                    (get_position_field(model, name) for name in names), values
+                )
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+        descending = self.ordering[0].startswith("-")
+        lookup = LessThan if descending != reverse else GreaterThan
+        return lookup(RowValue(*names), RowValue(*values))
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        # Positions are unique, so the next page never needs an offset
+        return None if cursor is None else cursor._replace(offset=0)
+
+    def _get_position_from_instance(self, instance, ordering):
+        return self.position_separator.join(
+            str(
+                instance[name]
+                if isinstance(instance, dict)
+                else getattr(instance, name)
+            )
+            for name in (field.lstrip("-") for field in ordering)
+        )
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count is not None:
+            response.data = {"count": self.count, **response.data}
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"] = {"type": "integer", "example": 123}
+        return response_schema
@@ -0,0 +1,75 @@
+import codecs
+import csv
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+
+class ORJSONParser(JSONParser):
+    """
+    Parses JSON with orjson, which rejects NaN and Infinity like the strict rest_framework parser.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            content = stream.read() if stream is not None else b""
+            # orjson only reads UTF-8
+            if encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class NDJSONParser(BaseParser):
+    """
+    Lazily parses newline-delimited JSON into an iterator of rows.
+    Lines that are not valid JSON are yielded as raw strings so they can be reported per row.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        decoded_stream = codecs.getreader(encoding)(stream)
+        return self.iter_rows(decoded_stream)
+
+    @staticmethod
+    def iter_rows(lines):
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield orjson.loads(line)
+            except ValueError:
+                yield line
+
+
+class CSVParser(BaseParser):
+    """
+    Lazily parses CSV with a header row into an iterator of rows.
+    Empty cells are dropped so the serializer defaults apply.
+    """
+
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        decoded_stream = codecs.getreader(encoding)(stream)
+        return self.iter_rows(decoded_stream)
+
+    @staticmethod
+    def iter_rows(lines):
+        for row in csv.DictReader(lines):
+            yield {
+                key: value
+                for key, value in row.items()
+                if key and value not in ("", None)
+            }
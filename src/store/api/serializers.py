@@ -2,8 +2,14 @@ from decimal import Decimal
 from typing import Union
 from rest_framework import serializers
 from mixins import DiscountPriceMixin
+from store.models import Product
 from validators import validate_price
 
+# Limits of the product columns, so values the database can't store fail validation
+PRICE_MAX_DIGITS = Product._meta.get_field("price").max_digits
+COST_PRICE_MAX_DIGITS = Product._meta.get_field("cost_price").max_digits
+QUANTITY_MAX_VALUE = 2**31 - 1
+
 
 # Serializer for listing products.
 class ProductSearchSerializer(DiscountPriceMixin, serializers.Serializer):
@@ -31,11 +37,13 @@ class ProductSerializer(serializers.Serializer):
     category_id = serializers.IntegerField(
         help_text="ID of the category. Use the 'v1/categories/search' endpoint to get available categories.",
     )
-    price = serializers.DecimalField(max_digits=10, decimal_places=2)
-    quantity = serializers.IntegerField()
-    discount = serializers.IntegerField(default=0)
+    price = serializers.DecimalField(max_digits=PRICE_MAX_DIGITS, decimal_places=2)
+    quantity = serializers.IntegerField(min_value=0, max_value=QUANTITY_MAX_VALUE)
+    discount = serializers.IntegerField(default=0, min_value=0, max_value=100)
     available = serializers.BooleanField(default=True)
-    cost_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    cost_price = serializers.DecimalField(
+        max_digits=COST_PRICE_MAX_DIGITS, decimal_places=2
+    )
     created_at = serializers.DateTimeField(read_only=True, format="%Y-%m-%d %H:%M")
     updated_at = serializers.DateTimeField(read_only=True, format="%Y-%m-%d %H:%M")
 
@@ -61,12 +69,18 @@ class ProductPartialUpdateSerializer(serializers.Serializer):
         help_text="ID of the category. Use the /categories/ endpoint to get available categories.",
         required=False,
     )
-    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
-    quantity = serializers.IntegerField(required=False)
-    discount = serializers.IntegerField(default=0, required=False)
+    price = serializers.DecimalField(
+        max_digits=PRICE_MAX_DIGITS, decimal_places=2, required=False
+    )
+    quantity = serializers.IntegerField(
+        min_value=0, max_value=QUANTITY_MAX_VALUE, required=False
+    )
+    discount = serializers.IntegerField(
+        default=0, min_value=0, max_value=100, required=False
+    )
     available = serializers.BooleanField(default=True, required=False)
     cost_price = serializers.DecimalField(
-        max_digits=10, decimal_places=2, required=False
+        max_digits=COST_PRICE_MAX_DIGITS, decimal_places=2, required=False
     )
 
     def validate(
@@ -77,6 +91,9 @@ class ProductPartialUpdateSerializer(serializers.Serializer):
         does not fall below the cost price.
         """
         instance = self.instance
+        # Without an instance the update itself checks the price against the stored values
+        if instance is None:
+            return attrs
         cost_price = attrs.get("cost_price", instance.cost_price)
         price = attrs.get("price", instance.price)
         discount = attrs.get("discount", instance.discount)
@@ -91,3 +108,60 @@ class ProductPartialUpdateSerializer(serializers.Serializer):
 class CategorySerializer(serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     name = serializers.CharField(max_length=100)
+
+
+class RepriceRuleSerializer(serializers.Serializer):
+    category_id = serializers.IntegerField(required=False)
+    min_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False
+    )
+    max_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False
+    )
+    available = serializers.BooleanField(required=False)
+    price_change = serializers.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        min_value=Decimal("-99.99"),
+        required=False,
+        help_text="Percentage change of the price, e.g. -10 lowers prices by 10%.",
+    )
+    discount = serializers.IntegerField(min_value=0, max_value=100, required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        if "price_change" not in attrs and "discount" not in attrs:
+            raise serializers.ValidationError(
+                "Specify a price change or a discount to apply."
+            )
+        return attrs
+
+
+class RepriceItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    discount = serializers.IntegerField(min_value=0, max_value=100, required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        if "price" not in attrs and "discount" not in attrs:
+            raise serializers.ValidationError("Specify a price or a discount to set.")
+        return attrs
+
+
+class RepriceSerializer(serializers.Serializer):
+    rule = RepriceRuleSerializer(
+        required=False,
+        help_text="Changes every product matching the filters.",
+    )
+    items = RepriceItemSerializer(
+        many=True,
+        required=False,
+        help_text="Sets the price and/or discount of each listed product.",
+    )
+
+    def validate(self, attrs: dict) -> dict:
+        if ("rule" in attrs) == ("items" in attrs):
+            raise serializers.ValidationError("Specify either a rule or items.")
+        ids = [item["id"] for item in attrs.get("items", ())]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each product can be listed only once.")
+        return attrs
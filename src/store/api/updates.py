@@ -0,0 +1,46 @@
+from typing import Sequence
+
+from django.db import connections, transaction
+from django.db.models import QuerySet
+from django.db.models.sql import UpdateQuery
+
+
+def update_returning(
+    queryset: QuerySet, values: dict, returning: Sequence[str]
+) -> list[dict]:
+    """
+    Runs queryset.update(**values) as a single UPDATE ... RETURNING (PostgreSQL)
+    and returns the given fields of the updated rows, so they don't have to be read again.
+    Like update(), it doesn't call save() or send signals.
+    """
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(values)
+    query.annotations = {}
+    compiler = query.get_compiler(queryset.db)
+    sql, params = compiler.as_sql()
+
+    connection = connections[queryset.db]
+    fields = [queryset.model._meta.get_field(name) for name in returning]
+    columns = ", ".join(
+        f"{connection.ops.quote_name(query.get_meta().db_table)}."
+        f"{connection.ops.quote_name(field.column)}"
+        for field in fields
+    )
+    with transaction.mark_for_rollback_on_error(
+        queryset.db
+    ), connection.cursor() as cursor:
+        cursor.execute(f"{sql} RETURNING {columns}", params)
+        rows = cursor.fetchall()
+
+    converters = [field.get_db_converters(connection) for field in fields]
+    results = []
+    for row in rows:
+        result = {}
+        for name, field, field_converters, value in zip(
+            returning, fields, converters, row
+        ):
+            for converter in field_converters:
+                value = converter(value, field, connection)
+            result[name] = value
+        results.append(result)
+    return results
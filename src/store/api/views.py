@@ -1,13 +1,43 @@
-from django.core.exceptions import ObjectDoesNotExist
+from decimal import Decimal
+from itertools import islice
+
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Round
+from django.db.models.lookups import LessThan
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import viewsets, status, generics, mixins
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.serializers import as_serializer_error
 
-from store.api.filters import ProductFilter
+from store.api.cache import bump_catalog_version, cache_catalog_response
+from store.api.conditional import (
+    conditional_catalog_response,
+    detail_validators,
+    list_validators,
+)
+from store.api.fast_serializers import get_fast_serializer
+from store.api.filters import PRODUCT_ORDERINGS, ProductFilter
+from store.api.integrity import FOREIGN_KEY_VIOLATION, UNIQUE_VIOLATION, get_sqlstate
+from store.api.pagination import ProductCursorPagination, ProductPageNumberPagination
+from store.api.parsers import CSVParser, NDJSONParser, ORJSONParser
+from store.api.deletion import delete_category
+from store.api.export import EXPORT_FIELDS, EXPORT_FORMATS
+from store.api.updates import update_returning
+from config.constants import (
+    BULK_IMPORT_CHUNK_SIZE,
+    EXPORT_CHUNK_SIZE,
+    REPRICE_CHUNK_SIZE,
+)
 from permissions import IsAdmin
+from validators import valid_price_condition, validate_price
 from store.models import Product, Category
 from store.api.serializers import (
     CategorySerializer,
@@ -15,6 +45,7 @@ from store.api.serializers import (
     ProductDetailSerializer,
     ProductSearchSerializer,
     ProductPartialUpdateSerializer,
+    RepriceSerializer,
 )
 
 
@@ -26,6 +57,27 @@ class ProductSearchViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Product.objects.all()
     filter_backends = (DjangoFilterBackend,)
     filterset_class = ProductFilter
+    pagination_query_param = "pagination"
+    # Select a page of the list, whose conditional GET validators are shared by all pages
+    page_query_params = ("page", "cursor", "count")
+    cache_query_params = (
+        *ProductFilter.base_filters,
+        pagination_query_param,
+        *page_query_params,
+    )
+
+    # Select pagination based on the "pagination" query parameter
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            request = getattr(self, "request", None)
+            if request is not None and (
+                request.query_params.get(self.pagination_query_param) == "cursor"
+            ):
+                self._paginator = ProductCursorPagination()
+            else:
+                self._paginator = ProductPageNumberPagination()
+        return self._paginator
 
     # Select serializer based on the action
     def get_serializer_class(self):
@@ -38,6 +90,10 @@ class ProductSearchViewSet(viewsets.ReadOnlyModelViewSet):
             raise Exception(f"Serializer for {self.action=} is not exist")
         return serializer
 
+    # Read-only actions render values() rows instead of model instances
+    def get_fast_serializer(self):
+        return get_fast_serializer(self.get_serializer_class())
+
     # Parameters for filtering products
     CATEGORY = openapi.Parameter(
         name="category",
@@ -57,16 +113,84 @@ class ProductSearchViewSet(viewsets.ReadOnlyModelViewSet):
         description="Filter products by maximum price.",
         type=openapi.TYPE_NUMBER,
     )
+    MIN_DISCOUNTED_PRICE = openapi.Parameter(
+        name="min_discounted_price",
+        in_=openapi.IN_QUERY,
+        description="Filter products by minimum price after discount.",
+        type=openapi.TYPE_NUMBER,
+    )
+    MAX_DISCOUNTED_PRICE = openapi.Parameter(
+        name="max_discounted_price",
+        in_=openapi.IN_QUERY,
+        description="Filter products by maximum price after discount.",
+        type=openapi.TYPE_NUMBER,
+    )
+    AVAILABLE = openapi.Parameter(
+        name="available",
+        in_=openapi.IN_QUERY,
+        description="Filter products by availability.",
+        type=openapi.TYPE_BOOLEAN,
+    )
     NAME = openapi.Parameter(
         name="name",
         in_=openapi.IN_QUERY,
-        description="Filter products by name. Search is case-insensitive.",
+        description="Filter products by name. Search is case-insensitive and results "
+        "are ordered by relevance.",
         type=openapi.TYPE_STRING,
     )
+    SEARCH_MODE = openapi.Parameter(
+        name="search_mode",
+        in_=openapi.IN_QUERY,
+        description="How the name filter is applied: 'trigram' (default) for substring "
+        "search or 'fulltext' for word search with ranking.",
+        type=openapi.TYPE_STRING,
+        enum=["trigram", "fulltext"],
+    )
+    PAGINATION = openapi.Parameter(
+        name="pagination",
+        in_=openapi.IN_QUERY,
+        description="Pagination mode: 'page' (default) or 'cursor' for keyset pagination.",
+        type=openapi.TYPE_STRING,
+        enum=["page", "cursor"],
+    )
+    CURSOR = openapi.Parameter(
+        name="cursor",
+        in_=openapi.IN_QUERY,
+        description="Opaque cursor returned in 'next'/'previous' links (cursor mode only).",
+        type=openapi.TYPE_STRING,
+    )
+    ORDERING = openapi.Parameter(
+        name="ordering",
+        in_=openapi.IN_QUERY,
+        description="Ordering of results. Overrides relevance ordering of name searches.",
+        type=openapi.TYPE_STRING,
+        enum=list(PRODUCT_ORDERINGS),
+    )
+    COUNT = openapi.Parameter(
+        name="count",
+        in_=openapi.IN_QUERY,
+        description="Total count mode. 'estimate' uses planner statistics when no filter is set. "
+        "In cursor mode the count is skipped unless 'exact' or 'estimate' is given.",
+        type=openapi.TYPE_STRING,
+        enum=["exact", "estimate"],
+    )
 
     @swagger_auto_schema(
         operation_description="API endpoint for listing products with optional filters.",
-        manual_parameters=[CATEGORY, MIN_PRICE, MAX_PRICE, NAME],
+        manual_parameters=[
+            CATEGORY,
+            MIN_PRICE,
+            MAX_PRICE,
+            MIN_DISCOUNTED_PRICE,
+            MAX_DISCOUNTED_PRICE,
+            AVAILABLE,
+            NAME,
+            SEARCH_MODE,
+            PAGINATION,
+            CURSOR,
+            ORDERING,
+            COUNT,
+        ],
         responses={
             200: openapi.Response(
                 "List of products.", ProductDetailSerializer(many=True)
@@ -74,27 +198,49 @@ class ProductSearchViewSet(viewsets.ReadOnlyModelViewSet):
         },
         operation_id="ListProducts",
     )
+    @conditional_catalog_response(list_validators)
+    @cache_catalog_response
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        fast_serializer = self.get_fast_serializer()
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *fast_serializer.lookups
+        )
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast_serializer.serialize(page))
+        return Response(fast_serializer.serialize(queryset))
 
     @swagger_auto_schema(
         operation_description="API endpoint for retrieving a product by ID.",
         responses={200: openapi.Response("Product details.", ProductDetailSerializer)},
         operation_id="RetrieveProductByID",
     )
+    @conditional_catalog_response(detail_validators)
+    @cache_catalog_response
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        fast_serializer = self.get_fast_serializer()
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *fast_serializer.lookups
+        )
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(queryset, pk=kwargs[lookup_url_kwarg])
+        self.check_object_permissions(request, row)
+        return Response(fast_serializer.to_representation(row))
 
 
 class CategorySearchAPIView(generics.ListAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_query_params = ("page",)
 
     @swagger_auto_schema(
         operation_description="API endpoint for listing categories.",
         responses={200: openapi.Response("List of categories", CategorySerializer)},
         operation_id="ListCategories",
     )
+    @cache_catalog_response
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -119,31 +265,361 @@ class ProductCreateAPIView(generics.GenericAPIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check the existence of the specified category
+        # The category and name checks are left to the FK and unique constraints,
+        # so creation takes a single INSERT and is safe against concurrent requests
         try:
-            category = Category.objects.get(id=serializer.validated_data["category_id"])
-        except ObjectDoesNotExist:
+            # A savepoint, so a rejected INSERT doesn't abort an enclosing transaction
+            with transaction.atomic():
+                product = Product.objects.create(
+                    name=serializer.validated_data["name"],
+                    category_id=serializer.validated_data["category_id"],
+                    price=serializer.validated_data["price"],
+                    quantity=serializer.validated_data["quantity"],
+                    discount=serializer.validated_data["discount"],
+                    available=serializer.validated_data["available"],
+                    cost_price=serializer.validated_data["cost_price"],
+                )
+                # The category FK is deferred, so check it now rather than at commit
+                connection.check_constraints()
+        except IntegrityError as error:
+            sqlstate = get_sqlstate(error)
+            if sqlstate == FOREIGN_KEY_VIOLATION:
+                message = "This category doesn't exist."
+            elif sqlstate == UNIQUE_VIOLATION:
+                message = "A product with the same name already exists."
+            else:
+                raise
+            return Response({"message": message}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(ProductSerializer(product).data, status=status.HTTP_201_CREATED)
+
+
+class ProductBulkUpsertAPIView(generics.GenericAPIView):
+    """
+    A view for importing products in bulk, creating new products and updating existing ones by name.
+    """
+
+    serializer_class = ProductSerializer
+    permission_classes = (IsAdmin,)
+    parser_classes = (ORJSONParser, NDJSONParser, CSVParser)
+    upsert_fields = (
+        "category",
+        "price",
+        "quantity",
+        "discount",
+        "available",
+        "cost_price",
+        "updated_at",
+    )
+
+    @swagger_auto_schema(
+        operation_description="API endpoint for creating or updating products in bulk. "
+        "Accepts a JSON array, NDJSON (application/x-ndjson) or CSV (text/csv) with a header row. "
+        "Products are matched by name; rows that fail validation are reported and skipped.",
+        request_body=ProductSerializer(many=True),
+        responses={200: openapi.Response("Import report.")},
+        operation_id="BulkUpsertProducts",
+    )
+    def post(self, request):
+        rows = request.data
+        if isinstance(rows, (dict, str)):
             return Response(
-                {"message": "This category doesn't exist."},
+                {"message": "Expected a list of products."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Check the existence of a product with the specified name
-        if Product.objects.filter(name=serializer.validated_data["name"]).exists():
+        rows = iter(enumerate(rows, start=1))
+        seen_names = set()
+        imported = 0
+        errors = []
+        while chunk := list(islice(rows, BULK_IMPORT_CHUNK_SIZE)):
+            imported += self.import_chunk(chunk, seen_names, errors)
+
+        if imported:
+            bump_catalog_version()
+        errors.sort(key=lambda error: error["row"])
+        return Response(
+            {"imported": imported, "failed": len(errors), "errors": errors},
+            status=status.HTTP_200_OK,
+        )
+
+    def import_chunk(self, chunk, seen_names: set, errors: list) -> int:
+        """
+        Validates a chunk of rows and upserts the valid ones with a single INSERT ... ON CONFLICT.
+        Returns the number of imported rows; failed rows are appended to errors.
+        """
+        # A single serializer instance is reused so its fields are built only once
+        serializer = self.get_serializer()
+        valid_rows = []
+        for row_number, row in chunk:
+            if not isinstance(row, dict):
+                errors.append(
+                    {"row": row_number, "errors": {"message": "Expected an object."}}
+                )
+                continue
+
+            try:
+                data = serializer.run_validation(row)
+            except ValidationError as exc:
+                errors.append({"row": row_number, "errors": as_serializer_error(exc)})
+                continue
+
+            name = data["name"]
+            if name in seen_names:
+                errors.append(
+                    {
+                        "row": row_number,
+                        "errors": {
+                            "message": "A product with the same name is already in the import."
+                        },
+                    }
+                )
+                continue
+            seen_names.add(name)
+            valid_rows.append((row_number, data))
+
+        # Check the existence of all referenced categories at once
+        category_ids = set(
+            Category.objects.filter(
+                id__in={data["category_id"] for _, data in valid_rows}
+            ).values_list("id", flat=True)
+        )
+        products = []
+        row_numbers = []
+        for row_number, data in valid_rows:
+            if data["category_id"] not in category_ids:
+                errors.append(
+                    {
+                        "row": row_number,
+                        "errors": {"message": "This category doesn't exist."},
+                    }
+                )
+                continue
+            products.append(Product(**data))
+            row_numbers.append(row_number)
+
+        if not products:
+            return 0
+        try:
+            self.upsert(products)
+        except DatabaseError:
+            # Retry row by row so a row the database rejects doesn't fail the whole chunk
+            imported = 0
+            for row_number, product in zip(row_numbers, products):
+                try:
+                    self.upsert([product])
+                except DatabaseError as exc:
+                    errors.append(
+                        {"row": row_number, "errors": {"message": str(exc).strip()}}
+                    )
+                else:
+                    imported += 1
+            return imported
+        return len(products)
+
+    def upsert(self, products: list[Product]) -> None:
+        # A savepoint keeps a failed statement from aborting an outer transaction
+        with transaction.atomic():
+            Product.objects.bulk_create(
+                products,
+                update_conflicts=True,
+                unique_fields=("name",),
+                update_fields=self.upsert_fields,
+            )
+
+
+class ProductRepriceAPIView(generics.GenericAPIView):
+    """
+    A view for changing the prices and discounts of many products at once.
+    """
+
+    serializer_class = RepriceSerializer
+    permission_classes = (IsAdmin,)
+    price_field = Product._meta.get_field("price")
+    discount_field = Product._meta.get_field("discount")
+    # Prices from this value up don't fit the price column
+    max_price = Decimal(10) ** (price_field.max_digits - price_field.decimal_places)
+
+    @swagger_auto_schema(
+        operation_description="API endpoint for repricing products in bulk. Either a rule changes "
+        "every product matching its filters, or items set the price and/or discount of listed "
+        "products. Prices are validated in the database and each chunk is updated with a single "
+        "statement; the products whose new price would be invalid are reported and left unchanged.",
+        request_body=RepriceSerializer,
+        responses={200: openapi.Response("Repricing report.")},
+        operation_id="RepriceProducts",
+    )
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        rule = serializer.validated_data.get("rule")
+        chunks = (
+            self.get_rule_chunks(rule)
+            if rule
+            else self.get_item_chunks(serializer.validated_data["items"])
+        )
+        updated = 0
+        rejected = []
+        for ids, values in chunks:
+            updated += self.reprice_chunk(ids, values, rejected)
+
+        if updated:
+            bump_catalog_version()
+        return Response(
+            {"updated": updated, "rejected": rejected}, status=status.HTTP_200_OK
+        )
+
+    def get_rule_chunks(self, rule: dict):
+        """
+        Yields the ids of the products matching the rule in chunks, along with the new values.
+        """
+        queryset = Product.objects.all()
+        if "category_id" in rule:
+            queryset = queryset.filter(category_id=rule["category_id"])
+        if "min_price" in rule:
+            queryset = queryset.filter(price__gte=rule["min_price"])
+        if "max_price" in rule:
+            queryset = queryset.filter(price__lte=rule["max_price"])
+        if "available" in rule:
+            queryset = queryset.filter(available=rule["available"])
+
+        values = {}
+        if "price_change" in rule:
+            factor = 1 + rule["price_change"] / 100
+            values["price"] = Round(
+                F("price") * Value(factor, output_field=self.price_field),
+                self.price_field.decimal_places,
+                output_field=self.price_field,
+            )
+        if "discount" in rule:
+            values["discount"] = Value(rule["discount"])
+
+        # Keyset pagination, so rows updated by a chunk aren't matched again
+        last_id = 0
+        while ids := list(
+            queryset.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:REPRICE_CHUNK_SIZE]
+        ):
+            yield ids, values
+            last_id = ids[-1]
+
+    def get_item_chunks(self, items: list[dict]):
+        """
+        Yields the ids of the listed products in chunks, along with CASE expressions of their new values.
+        """
+        items = iter(items)
+        while chunk := list(islice(items, REPRICE_CHUNK_SIZE)):
+            values = {}
+            for name, field in (
+                ("price", self.price_field),
+                ("discount", self.discount_field),
+            ):
+                cases = [
+                    When(id=item["id"], then=Value(item[name]))
+                    for item in chunk
+                    if name in item
+                ]
+                if cases:
+                    values[name] = Case(*cases, default=F(name), output_field=field)
+            yield [item["id"] for item in chunk], values
+
+    def reprice_chunk(self, ids: list[int], values: dict, rejected: list) -> int:
+        """
+        Updates the chunk with a single UPDATE whose WHERE clause checks the new prices.
+        Returns the number of updated products; rejected ones are appended to rejected.
+        """
+        price = values.get("price", F("price"))
+        discount = values.get("discount", F("discount"))
+        queryset = Product.objects.filter(id__in=ids)
+        rows = update_returning(
+            queryset.filter(
+                valid_price_condition(F("cost_price"), price, discount),
+                LessThan(price, Value(self.max_price)),
+            ),
+            {**values, "updated_at": timezone.now()},
+            returning=("id",),
+        )
+        if len(rows) == len(ids):
+            return len(rows)
+
+        updated_ids = {row["id"] for row in rows}
+        not_updated = [id_ for id_ in ids if id_ not in updated_ids]
+        # Read the rejected rows with their new values, only to explain the rejection
+        products = {
+            product["id"]: product
+            for product in queryset.filter(id__in=not_updated)
+            .annotate(new_price=price, new_discount=discount)
+            .values("id", "cost_price", "new_price", "new_discount")
+        }
+        for id_ in not_updated:
+            product = products.get(id_)
+            if product is None:
+                message = "This product doesn't exist."
+            elif product["new_price"] >= self.max_price:
+                message = f"Product price must be lower than {self.max_price}."
+            else:
+                try:
+                    validate_price(
+                        product["cost_price"],
+                        product["new_price"],
+                        product["new_discount"] or 0,
+                    )
+                except ValidationError as exc:
+                    message = exc.detail[0]
+                else:
+                    message = "The product was changed during repricing."
+            rejected.append({"id": id_, "message": message})
+        return len(rows)
+
+
+class ProductExportAPIView(generics.GenericAPIView):
+    """
+    A view for streaming the whole catalog as CSV or NDJSON.
+    """
+
+    queryset = Product.objects.all()
+    permission_classes = (IsAdmin,)
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = ProductFilter
+    pagination_class = None
+    export_format_query_param = "export_format"
+
+    EXPORT_FORMAT = openapi.Parameter(
+        name="export_format",
+        in_=openapi.IN_QUERY,
+        description="Export format: 'csv' (default) or 'ndjson'.",
+        type=openapi.TYPE_STRING,
+        enum=list(EXPORT_FORMATS),
+    )
+
+    @swagger_auto_schema(
+        operation_description="API endpoint for exporting products. Supports the product search filters.",
+        manual_parameters=[EXPORT_FORMAT],
+        responses={200: openapi.Response("Exported products.")},
+        operation_id="ExportProducts",
+    )
+    def get(self, request):
+        export_format = request.query_params.get(self.export_format_query_param, "csv")
+        if export_format not in EXPORT_FORMATS:
             return Response(
-                {"message": "A product with the same name already exists."},
+                {"message": f"Unsupported export format: {export_format}."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        product = Product.objects.create(
-            name=serializer.validated_data["name"],
-            category=category,
-            price=serializer.validated_data["price"],
-            quantity=serializer.validated_data["quantity"],
-            discount=serializer.validated_data["discount"],
-            available=serializer.validated_data["available"],
-            cost_price=serializer.validated_data["cost_price"],
+        content_type, iter_rows = EXPORT_FORMATS[export_format]
+
+        # Tuples from a server-side cursor keep memory flat regardless of catalog size
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .values_list(*EXPORT_FIELDS.values())
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
         )
-        return Response(ProductSerializer(product).data, status=status.HTTP_201_CREATED)
+        response = StreamingHttpResponse(iter_rows(rows), content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="products.{export_format}"'
+        )
+        return response
 
 
 class ProductDetailUpdateAPIView(
@@ -168,11 +644,39 @@ class ProductDetailUpdateAPIView(
             raise Exception(f"Serializer for {method=} does not exist.")
         return serializer_class
 
+    # Columns the price validation of updates reads
+    price_fields = ("cost_price", "price", "discount")
+    # Columns rendered by ProductSerializer, returned by the UPDATE
+    returning_fields = (
+        "id",
+        "name",
+        "category_id",
+        "price",
+        "quantity",
+        "discount",
+        "available",
+        "cost_price",
+        "created_at",
+        "updated_at",
+    )
+
+    # ProductSerializer renders every column; deletion only needs the primary key
+    # and updates only read the price columns when validation needs them
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        method = self.request.method.lower()
+        if method == "delete":
+            queryset = queryset.only("id")
+        elif method in ("put", "patch"):
+            queryset = queryset.only("id", *self.price_fields)
+        return queryset
+
     @swagger_auto_schema(
         operation_description="API endpoint for retrieving a product by ID.",
         responses={200: openapi.Response("Product details.", ProductSerializer)},
         operation_id="RetrieveProductByIDStaff",
     )
+    @conditional_catalog_response(detail_validators)
     def get(self, request, *args, **kwargs):
         return self.retrieve(request, *args, **kwargs)
 
@@ -198,21 +702,78 @@ class ProductDetailUpdateAPIView(
         operation_id="DeleteProduct",
     )
     def delete(self, request, *args, **kwargs):
-        return self.destroy(request, *args, **kwargs)
+        response = self.destroy(request, *args, **kwargs)
+        # Product deletions don't send signals to the catalog cache
+        bump_catalog_version()
+        return response
 
     def update_product(self, request, **kwargs):
-        instance = self.get_object()
+        """
+        Updates only the submitted columns with a single UPDATE ... RETURNING.
+        For partial updates the price check runs in the UPDATE's WHERE clause against the
+        stored values; the row is read only when the update doesn't match.
+        """
         partial = kwargs.pop("partial", False)
-        serializer = self.get_serializer(instance, data=request.data, partial=partial)
-
+        retried = kwargs.pop("retried", False)
+        serializer = self.get_serializer(data=request.data, partial=partial)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        for attr, value in serializer.validated_data.items():
-            setattr(instance, attr, value)
+        values = serializer.validated_data
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        if partial:
+            queryset = queryset.filter(
+                valid_price_condition(
+                    *(values.get(field, F(field)) for field in self.price_fields)
+                )
+            )
 
-        instance.save()
-        return Response(ProductSerializer(instance).data, status=status.HTTP_200_OK)
+        try:
+            # A savepoint, so a rejected UPDATE doesn't abort an enclosing transaction
+            with transaction.atomic():
+                rows = update_returning(
+                    queryset,
+                    {**values, "updated_at": timezone.now()},
+                    returning=self.returning_fields,
+                )
+                if "category_id" in values:
+                    # The category FK is deferred, so check it now rather than at commit
+                    connection.check_constraints()
+        except IntegrityError as error:
+            sqlstate = get_sqlstate(error)
+            if sqlstate == FOREIGN_KEY_VIOLATION:
+                message = "This category doesn't exist."
+            elif sqlstate == UNIQUE_VIOLATION:
+                message = "A product with the same name already exists."
+            else:
+                raise
+            return Response({"message": message}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not rows:
+            # Either the product doesn't exist or the new price is invalid for the stored values
+            instance = self.get_object()
+            serializer = self.get_serializer(
+                instance, data=request.data, partial=partial
+            )
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            if retried:
+                # The prices keep changing, or the SQL and Python checks disagree on a boundary value
+                return Response(
+                    {
+                        "message": "The product's prices changed during the update, try again."
+                    },
+                    status=status.HTTP_409_CONFLICT,
+                )
+            # The stored prices changed in the meantime and the update is valid now
+            return self.update_product(request, **kwargs, partial=partial, retried=True)
+
+        # Updates through the queryset don't send signals to the catalog cache
+        bump_catalog_version()
+        return Response(ProductSerializer(rows[0]).data, status=status.HTTP_200_OK)
 
 
 class CategoryCreateAPIView(generics.GenericAPIView):
@@ -237,16 +798,18 @@ class CategoryCreateAPIView(generics.GenericAPIView):
 
         category_name = serializer.validated_data["name"]
         try:
-            Category.objects.get(name=category_name)
+            with transaction.atomic():
+                category = Category.objects.create(name=category_name)
+        except IntegrityError as error:
+            if get_sqlstate(error) != UNIQUE_VIOLATION:
+                raise
             return Response(
                 {"message": "A category with the same name already exists."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        except ObjectDoesNotExist:
-            category = Category.objects.create(name=category_name)
-            return Response(
-                CategorySerializer(category).data, status=status.HTTP_201_CREATED
-            )
+        return Response(
+            CategorySerializer(category).data, status=status.HTTP_201_CREATED
+        )
 
 
 class CategoryDetailAPIView(generics.RetrieveDestroyAPIView):
@@ -267,9 +830,13 @@ class CategoryDetailAPIView(generics.RetrieveDestroyAPIView):
         return self.retrieve(request, *args, **kwargs)
 
     @swagger_auto_schema(
-        operation_description="API endpoint for deleting a category by ID.",
+        operation_description="API endpoint for deleting a category by ID. Its products are deleted "
+        "in chunks; use the delete_category management command for very big categories.",
         operation_id="DeleteCategoryByIDStaff",
         responses={204: openapi.Response(description="Category deleted successfully.")},
     )
     def delete(self, request, *args, **kwargs):
         return self.destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        delete_category(instance)
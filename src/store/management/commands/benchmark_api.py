@@ -0,0 +1,401 @@
+import asyncio
+import itertools
+import json
+import random
+import re
+import subprocess
+import time
+import uuid
+from typing import Callable, Optional
+from urllib.parse import urlencode
+
+import orjson
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Max, Min
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from store.api.deletion import delete_products
+from store.management.commands.benchmark_async_views import (
+    PROJECT_DIR,
+    percentile,
+    send_request,
+    start_server,
+)
+from store.models import Category, Product
+
+# Query count and database time reported by InstrumentationMiddleware
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+# Settings of the benchmarked code: every request instrumented, nothing logged as slow
+BENCHMARK_SETTINGS = {
+    "INSTRUMENTATION_SAMPLE_RATE": 1.0,
+    "SERVER_TIMING_HEADER": True,
+    "SLOW_REQUEST_THRESHOLD_MS": float("inf"),
+}
+BENCHMARK_ENV = {
+    "INSTRUMENTATION_SAMPLE_RATE": "1",
+    "SERVER_TIMING": "true",
+    "SLOW_REQUEST_THRESHOLD_MS": "inf",
+}
+DUMMY_CACHE = "django.core.cache.backends.dummy.DummyCache"
+
+
+class Scenario:
+    """
+    A benchmarked endpoint. make_request(i) returns the method, the path and the JSON body
+    of the i-th request, so every run sends the same sequence of requests.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        make_request: Callable[[int], tuple[str, str, Optional[dict]]],
+        expected_status: int = 200,
+        admin: bool = False,
+    ):
+        self.name = name
+        self.make_request = make_request
+        self.expected_status = expected_status
+        self.admin = admin
+
+
+def summarize(
+    samples: list[tuple[float, bool, Optional[tuple[float, int]]]], elapsed: float
+) -> dict:
+    """
+    Aggregates (latency, ok, (db ms, queries) or None) samples of a scenario.
+    """
+    latencies = sorted(latency for latency, _, _ in samples)
+    db = [timing for _, _, timing in samples if timing is not None]
+    queries = db_ms = None
+    if db:
+        queries = round(sum(count for _, count in db) / len(db), 2)
+        db_ms = round(sum(duration for duration, _ in db) / len(db), 2)
+    return {
+        "requests": len(samples),
+        "errors": sum(not ok for _, ok, _ in samples),
+        "rps": round(len(samples) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "queries_per_request": queries,
+        "db_ms_per_request": db_ms,
+    }
+
+
+def parse_server_timing(header: Optional[str]) -> Optional[tuple[float, int]]:
+    match = SERVER_TIMING_DB.search(header or "")
+    if match is None:
+        return None
+    return float(match[1]), int(match[2])
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the product search, detail, create and patch endpoints and the category search "
+        "through an in-process client and/or a local gunicorn server driven over HTTP. "
+        "Reports p50/p95/p99 latency, throughput and queries per request, optionally as JSON "
+        "to compare builds. Run it on a catalog made by generate_catalog; products it creates "
+        "are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mode", choices=("inprocess", "http", "both"), default="both"
+        )
+        parser.add_argument(
+            "--requests", type=int, default=300, help="Requests per scenario."
+        )
+        parser.add_argument("--concurrency", type=int, default=16, help="HTTP clients.")
+        parser.add_argument("--scenarios", nargs="+", help="Run only these scenarios.")
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--port", type=int, default=8766)
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help=(
+                "Keep the configured cache; by default every request reaches the database. "
+                "Several HTTP workers need a shared cache backend."
+            ),
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the report as JSON to this file.")
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        scenarios = self.get_scenarios(run_id, options)
+        if options["scenarios"]:
+            unknown = set(options["scenarios"]) - {s.name for s in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+            scenarios = [s for s in scenarios if s.name in options["scenarios"]]
+
+        report = {
+            "started_at": timezone.now().isoformat(),
+            "git_commit": self.get_git_commit(),
+            "catalog": {
+                "products": Product.objects.count(),
+                "categories": Category.objects.count(),
+            },
+            "options": {
+                key: options[key]
+                for key in ("requests", "concurrency", "workers", "cache", "seed")
+            },
+            "results": [],
+        }
+        admin = get_user_model().objects.create(
+            username=f"benchmark-{run_id}", role=get_user_model().ADMIN
+        )
+        token = Token.objects.create(user=admin)
+        try:
+            if options["mode"] in ("inprocess", "both"):
+                report["results"] += self.run_inprocess(scenarios, admin, options)
+            if options["mode"] in ("http", "both"):
+                report["results"] += self.run_http(scenarios, token.key, options)
+        finally:
+            delete_products(
+                list(
+                    Product.objects.filter(
+                        name__startswith=f"benchmark-{run_id}-"
+                    ).values_list("id", flat=True)
+                )
+            )
+            admin.delete()
+
+        self.print_report(report["results"])
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    def get_scenarios(self, run_id: str, options) -> list[Scenario]:
+        rng = random.Random(options["seed"])
+        bounds = Product.objects.aggregate(min_id=Min("id"), max_id=Max("id"))
+        if bounds["min_id"] is None:
+            raise CommandError("The catalog is empty; run generate_catalog first.")
+        # The biggest and a small category, to cover both ends of the skew
+        categories = list(
+            Category.objects.annotate(products=Count("product"))
+            .filter(products__gt=0)
+            .order_by("-products")
+            .values_list("name", "id")
+        )
+        big_category, big_category_id = categories[0]
+        small_category = categories[len(categories) // 2][0]
+        # Existing products, so detail requests don't hit gaps in the ids
+        detail_ids = list(
+            Product.objects.filter(
+                id__gte=rng.randint(bounds["min_id"], bounds["max_id"])
+            ).values_list("id", flat=True)[:1000]
+        ) or [bounds["min_id"]]
+        # Products created by the create scenario, patched by the patch scenario
+        created_numbers = itertools.count()
+        created_ids = []
+
+        def create(i):
+            return (
+                "POST",
+                "/v1/products/",
+                {
+                    "name": f"benchmark-{run_id}-{next(created_numbers)}",
+                    "category_id": big_category_id,
+                    "price": "120.00",
+                    "quantity": 10,
+                    "discount": 10,
+                    "cost_price": "100.00",
+                },
+            )
+
+        def patch(i):
+            if not created_ids:
+                created_ids.extend(
+                    Product.objects.filter(
+                        name__startswith=f"benchmark-{run_id}-"
+                    ).values_list("id", flat=True)
+                )
+                if not created_ids:
+                    raise CommandError(
+                        "The patch scenario runs after the create scenario."
+                    )
+            product_id = created_ids[i % len(created_ids)]
+            return "PATCH", f"/v1/products/{product_id}/", {"quantity": i % 100}
+
+        def search(**params):
+            path = f"/v1/products/search/?{urlencode(params)}"
+            return lambda i: ("GET", path, None)
+
+        return [
+            Scenario("search", search()),
+            Scenario(
+                "search_deep_page",
+                lambda i: ("GET", f"/v1/products/search/?page={100 + i % 100}", None),
+            ),
+            Scenario("search_big_category", search(category=big_category)),
+            Scenario(
+                "search_small_category_price",
+                search(category=small_category, min_price=100, max_price=1000),
+            ),
+            Scenario(
+                "search_price_ordered",
+                search(min_price=100, max_price=200, ordering="price"),
+            ),
+            Scenario(
+                "search_discounted_available",
+                search(
+                    min_discounted_price=50, max_discounted_price=60, available="true"
+                ),
+            ),
+            Scenario(
+                "search_name_fulltext",
+                search(name="product 12", search_mode="fulltext"),
+            ),
+            Scenario(
+                "detail",
+                lambda i: (
+                    "GET",
+                    f"/v1/products/search/{detail_ids[i % len(detail_ids)]}/",
+                    None,
+                ),
+            ),
+            Scenario(
+                "category_search", lambda i: ("GET", "/v1/categories/search", None)
+            ),
+            Scenario("create", create, expected_status=201, admin=True),
+            Scenario("patch", patch, admin=True),
+        ]
+
+    def run_inprocess(self, scenarios: list[Scenario], admin, options) -> list[dict]:
+        overrides = dict(BENCHMARK_SETTINGS)
+        if not options["cache"]:
+            overrides["CACHES"] = {
+                **settings.CACHES,
+                "default": {"BACKEND": DUMMY_CACHE},
+            }
+        results = []
+        with override_settings(**overrides):
+            anonymous, authenticated = APIClient(), APIClient()
+            authenticated.force_authenticate(admin)
+            for scenario in scenarios:
+                client = authenticated if scenario.admin else anonymous
+                samples = []
+                started = time.perf_counter()
+                for i in range(options["requests"]):
+                    method, path, body = scenario.make_request(i)
+                    request_started = time.perf_counter()
+                    response = client.generic(
+                        method,
+                        path,
+                        orjson.dumps(body) if body is not None else "",
+                        content_type="application/json",
+                        HTTP_ACCEPT="application/json",
+                    )
+                    samples.append(
+                        (
+                            time.perf_counter() - request_started,
+                            response.status_code == scenario.expected_status,
+                            parse_server_timing(response.get("Server-Timing")),
+                        )
+                    )
+                elapsed = time.perf_counter() - started
+                results.append(
+                    {
+                        "scenario": scenario.name,
+                        "mode": "inprocess",
+                        **summarize(samples, elapsed),
+                    }
+                )
+        return results
+
+    def run_http(self, scenarios: list[Scenario], token: str, options) -> list[dict]:
+        host = "127.0.0.1"
+        env = {**BENCHMARK_ENV, "WEB_CONCURRENCY": str(options["workers"])}
+        if not options["cache"]:
+            env["CACHE_BACKEND"] = DUMMY_CACHE
+        server = start_server(host, options["port"], "sync", env)
+        try:
+            return [
+                {
+                    "scenario": scenario.name,
+                    "mode": "http",
+                    **asyncio.run(
+                        self.run_http_scenario(host, scenario, token, options)
+                    ),
+                }
+                for scenario in scenarios
+            ]
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    @staticmethod
+    async def run_http_scenario(
+        host: str, scenario: Scenario, token: str, options
+    ) -> dict:
+        headers = (f"Authorization: Token {token}",) if scenario.admin else ()
+        requests = iter(range(options["requests"]))
+        samples = []
+
+        async def client():
+            connection = None
+            for i in requests:
+                method, path, body = scenario.make_request(i)
+                started = time.perf_counter()
+                try:
+                    status_code, response_headers, connection = await send_request(
+                        host,
+                        options["port"],
+                        path,
+                        connection,
+                        method=method,
+                        body=orjson.dumps(body) if body is not None else b"",
+                        headers=headers,
+                    )
+                except (OSError, asyncio.IncompleteReadError):
+                    samples.append((time.perf_counter() - started, False, None))
+                    connection = None
+                    continue
+                samples.append(
+                    (
+                        time.perf_counter() - started,
+                        status_code == scenario.expected_status,
+                        parse_server_timing(response_headers.get("server-timing")),
+                    )
+                )
+            if connection is not None:
+                connection[1].close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(options["concurrency"])))
+        return summarize(samples, time.perf_counter() - started)
+
+    @staticmethod
+    def get_git_commit() -> Optional[str]:
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=PROJECT_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def print_report(self, results: list[dict]) -> None:
+        self.stdout.write(
+            f"{'scenario':<30}{'mode':<11}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'queries':>9}{'db ms':>8}{'errors':>8}"
+        )
+        for result in results:
+            queries = result["queries_per_request"]
+            db_ms = result["db_ms_per_request"]
+            self.stdout.write(
+                f"{result['scenario']:<30}{result['mode']:<11}{result['rps']:>9.0f}"
+                f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                f"{'-' if queries is None else f'{queries:.1f}':>9}"
+                f"{'-' if db_ms is None else f'{db_ms:.1f}':>8}{result['errors']:>8}"
+            )
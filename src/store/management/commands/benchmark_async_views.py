@@ -0,0 +1,211 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Directory holding gunicorn.conf.py, wsgi.py and asgi.py
+PROJECT_DIR = Path(__file__).resolve().parents[3]
+
+# (label, gunicorn worker class, path prefix of the benchmarked endpoints)
+SERVER_MODES = (
+    ("wsgi-sync", "sync", "/v1/"),
+    ("asgi-async", "uvicorn.workers.UvicornWorker", "/v1/async/"),
+)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+async def send_request(
+    host: str,
+    port: int,
+    path: str,
+    connection,
+    method: str = "GET",
+    body: bytes = b"",
+    headers: tuple[str, ...] = (),
+):
+    """
+    Sends a request over a keep-alive connection, reopening it if the server closed it.
+    Returns the status code, the response headers and the connection to reuse,
+    or None if it was closed.
+    """
+    if connection is None:
+        connection = await asyncio.open_connection(host, port)
+    reader, writer = connection
+    request_lines = [
+        f"{method} {path} HTTP/1.1",
+        f"Host: {host}:{port}",
+        "Accept: application/json",
+        *headers,
+    ]
+    if body:
+        request_lines += [
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+        ]
+    writer.write(("\r\n".join(request_lines) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    response_headers = dict(
+        line.lower().split(": ", 1) for line in header_lines if ": " in line
+    )
+    if "content-length" not in response_headers:
+        raise CommandError("Benchmarked responses must have a Content-Length header.")
+    await reader.readexactly(int(response_headers["content-length"]))
+
+    if response_headers.get("connection") == "close":
+        writer.close()
+        connection = None
+    return int(status_line.split()[1]), response_headers, connection
+
+
+def start_server(
+    host: str, port: int, worker_class: str, env: dict
+) -> subprocess.Popen:
+    """
+    Starts gunicorn with the project's configuration and waits until it accepts connections.
+    """
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        cwd=PROJECT_DIR,
+        env={
+            **os.environ,
+            "GUNICORN_BIND": f"{host}:{port}",
+            "GUNICORN_WORKER_CLASS": worker_class,
+            "GUNICORN_LOG_LEVEL": "warning",
+            **env,
+        },
+        # Drop the access log, errors still go to stderr
+        stdout=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise CommandError(f"The {worker_class} server exited on start.")
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise CommandError(f"The {worker_class} server didn't start in 30 seconds.")
+
+
+async def run_load(
+    host: str, port: int, path: str, requests: int, concurrency: int
+) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        connection = None
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                status_code, _, connection = await send_request(
+                    host, port, path, connection
+                )
+            except (OSError, asyncio.IncompleteReadError):
+                errors += 1
+                connection = None
+                continue
+            latencies.append(time.perf_counter() - started)
+            if status_code != 200:
+                errors += 1
+        if connection is not None:
+            connection[1].close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of the sync read endpoints served by gunicorn over WSGI "
+        "with their async versions served by uvicorn workers over ASGI, at increasing concurrency. "
+        "The catalog cache is disabled in the servers unless --cache is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoint",
+            default="products/search/?page=2",
+            help="Endpoint below the /v1/ (or /v1/async/) prefix.",
+        )
+        parser.add_argument("--concurrency", nargs="+", type=int, default=[16, 64, 256])
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=1,
+            help="Threads per WSGI worker; more than 1 uses the gthread worker.",
+        )
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Keep the configured cache, which must be shared by several workers.",
+        )
+
+    def handle(self, *args, **options):
+        host = "127.0.0.1"
+        self.stdout.write(
+            f"{'server':<12}{'clients':>8}{'req/s':>10}{'p50 ms':>9}"
+            f"{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+        )
+        for label, worker_class, prefix in SERVER_MODES:
+            env = {
+                "GUNICORN_THREADS": str(options["threads"]),
+                "WEB_CONCURRENCY": str(options["workers"]),
+            }
+            if not options["cache"]:
+                env["CACHE_BACKEND"] = "django.core.cache.backends.dummy.DummyCache"
+            server = start_server(host, options["port"], worker_class, env)
+            try:
+                path = prefix + options["endpoint"]
+                # Warm up every worker's connections and caches
+                asyncio.run(run_load(host, options["port"], path, 200, 20))
+                for concurrency in options["concurrency"]:
+                    result = asyncio.run(
+                        run_load(
+                            host,
+                            options["port"],
+                            path,
+                            options["requests"],
+                            concurrency,
+                        )
+                    )
+                    self.stdout.write(
+                        f"{label:<12}{concurrency:>8}{result['rps']:>10.0f}"
+                        f"{result['p50']:>9.1f}{result['p95']:>9.1f}"
+                        f"{result['p99']:>9.1f}{result['errors']:>8}"
+                    )
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
@@ -0,0 +1,178 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from store.api.fast_serializers import get_fast_serializer
+from store.api.filters import CharFilterInFilter, ProductFilter
+from store.api.serializers import ProductSearchSerializer
+from store.models import Category, Product
+
+# Indexes added for the ProductFilter query shapes, dropped to measure the "before" state
+FILTER_INDEXES = (
+    "product_category_price_idx",
+    "product_price_idx",
+    "product_available_idx",
+)
+
+SEED_CATEGORIES_SQL = """
+    INSERT INTO store_category (name, updated_at)
+    SELECT 'Benchmark category ' || g, now() FROM generate_series(1, %(categories)s) AS g
+    ON CONFLICT (name) DO NOTHING
+"""
+
+# Prices satisfy validate_price: price >= 1.1 * cost_price and discount <= 10%
+SEED_PRODUCTS_SQL = """
+    INSERT INTO store_product (
+        name, category_id, price, quantity, discount, available, cost_price,
+        created_at, updated_at
+    )
+    SELECT
+        'Benchmark product ' || (%(offset)s + g),
+        c.ids[1 + g %% array_length(c.ids, 1)],
+        round(p.cost_price * (1.1 + random() * 0.4)::numeric, 2),
+        (random() * 100)::int,
+        floor(random() * 3)::int * 5,
+        random() < 0.8,
+        p.cost_price,
+        now(),
+        now()
+    FROM generate_series(1, %(products)s) AS g
+    CROSS JOIN (
+        SELECT array_agg(id) AS ids FROM store_category
+        WHERE name LIKE 'Benchmark category %%'
+    ) AS c
+    CROSS JOIN LATERAL (
+        SELECT round((1 + random() * 5000 + g * 0)::numeric, 2) AS cost_price
+    ) AS p
+"""
+
+
+class LegacyProductFilter(ProductFilter):
+    # The category filter as it was before names were resolved to ids
+    category = CharFilterInFilter(field_name="category__name", lookup_expr="in")
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports EXPLAIN plans and latencies of the ProductFilter query shapes "
+        "with and without the filter indexes. Optionally seeds benchmark products first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Number of benchmark products to insert before measuring.",
+        )
+        parser.add_argument("--categories", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--plans",
+            action="store_true",
+            help="Print the full EXPLAIN ANALYZE output.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This benchmark requires PostgreSQL.")
+
+        if options["seed"]:
+            self.seed(options["seed"], options["categories"])
+
+        shapes = self.get_query_shapes()
+        after = {
+            label: self.measure(ProductFilter, params, options)
+            for label, params in shapes
+        }
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for index in FILTER_INDEXES:
+                    cursor.execute(f'DROP INDEX "{index}"')
+                cursor.execute(
+                    "CREATE INDEX benchmark_category_idx ON store_product (category_id)"
+                )
+            before = {
+                label: self.measure(LegacyProductFilter, params, options)
+                for label, params in shapes
+            }
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{'query shape':<40}{'before ms':>11}{'after ms':>11}{'count before':>14}"
+            f"{'count after':>13}"
+        )
+        for label, _ in shapes:
+            self.stdout.write(
+                f"{label:<40}{before[label]['page']:>11.2f}{after[label]['page']:>11.2f}"
+                f"{before[label]['count']:>14.2f}{after[label]['count']:>13.2f}"
+            )
+        for label, _ in shapes:
+            for state, results in (("before", before), ("after", after)):
+                self.stdout.write(f"\n{label} [{state}]")
+                self.stdout.write(results[label]["plan"])
+
+    def seed(self, products: int, categories: int) -> None:
+        started = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(SEED_CATEGORIES_SQL, {"categories": categories})
+            cursor.execute(
+                SEED_PRODUCTS_SQL,
+                {"products": products, "offset": Product.objects.count()},
+            )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE store_category, store_product")
+        self.stdout.write(
+            f"Seeded {products} products in {time.perf_counter() - started:.1f}s"
+        )
+
+    @staticmethod
+    def get_query_shapes() -> list[tuple[str, dict]]:
+        categories = ",".join(Category.objects.values_list("name", flat=True)[:2])
+        first_category = categories.split(",")[0]
+        return [
+            ("default listing", {}),
+            ("category", {"category": first_category}),
+            (
+                "categories + price range",
+                {"category": categories, "min_price": 100, "max_price": 500},
+            ),
+            ("price range", {"min_price": 100, "max_price": 200}),
+            (
+                "category ordered by price",
+                {"category": first_category, "ordering": "price"},
+            ),
+            ("available", {"available": "true"}),
+        ]
+
+    def measure(self, filterset_class, params: dict, options: dict) -> dict:
+        """
+        Times the first page and the count of a filtered listing and explains the page query.
+        """
+        queryset = filterset_class(params, queryset=Product.objects.all()).qs
+        page = queryset.values(*get_fast_serializer(ProductSearchSerializer).lookups)[
+            :10
+        ]
+
+        page_times = []
+        count_times = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            list(page.all())
+            page_times.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            queryset.count()
+            count_times.append(time.perf_counter() - started)
+
+        plan = page.explain(analyze=True)
+        if not options["plans"]:
+            plan = "\n".join(
+                line for line in plan.splitlines() if "Scan" in line or "Join" in line
+            )
+        return {
+            "page": statistics.median(page_times) * 1000,
+            "count": statistics.median(count_times) * 1000,
+            "plan": plan,
+        }
@@ -0,0 +1,97 @@
+import io
+import timeit
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from store.api.fast_serializers import get_fast_serializer
+from store.api.parsers import ORJSONParser
+from store.api.renderers import ORJSONRenderer
+from store.api.serializers import (
+    ProductDetailSerializer,
+    ProductSearchSerializer,
+    ProductSerializer,
+)
+from store.management.commands.benchmark_serializers import (
+    Command as SerializerBenchmark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares rendering and parsing of product payloads by the rest_framework JSON "
+        "renderer and parser with their orjson versions, checking that the output is identical."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-sizes", nargs="+", type=int, default=[1, 10, 100, 1000]
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'payload':<26}{'rows':>6}{'json ms':>10}{'orjson ms':>11}{'speedup':>9}"
+        )
+        for page_size in options["page_sizes"]:
+            for label, data in self.make_payloads(page_size):
+                self.compare(label, page_size, data, options["repeat"])
+
+    @staticmethod
+    def make_payloads(page_size: int):
+        """
+        Builds paginated search responses, detail responses and admin product responses
+        (Decimal prices) like the API returns them.
+        """
+        for serializer_class in (ProductSearchSerializer, ProductDetailSerializer):
+            fast_serializer = get_fast_serializer(serializer_class)
+            _, rows = SerializerBenchmark.make_page(page_size, fast_serializer.lookups)
+            results = fast_serializer.serialize(rows)
+            if page_size == 1:
+                yield serializer_class.__name__, results[0]
+            else:
+                yield (
+                    serializer_class.__name__,
+                    {
+                        "count": 2_000_000,
+                        "next": "http://localhost/v1/products/search/?page=3",
+                        "previous": "http://localhost/v1/products/search/",
+                        "results": results,
+                    },
+                )
+        products, _ = SerializerBenchmark.make_page(page_size, ())
+        data = ProductSerializer(products, many=True).data
+        yield ProductSerializer.__name__, data[0] if page_size == 1 else data
+
+    def compare(self, label: str, page_size: int, data, repeat: int) -> None:
+        renderer, fast_renderer = JSONRenderer(), ORJSONRenderer()
+        content = renderer.render(data)
+        if fast_renderer.render(data) != content:
+            raise AssertionError(f"{label} is rendered differently by orjson.")
+        if ORJSONParser().parse(io.BytesIO(content)) != JSONParser().parse(
+            io.BytesIO(content)
+        ):
+            raise AssertionError(f"{label} is parsed differently by orjson.")
+
+        number = max(1, 20000 // page_size)
+        for operation, default, fast in (
+            (
+                "render",
+                lambda: renderer.render(data),
+                lambda: fast_renderer.render(data),
+            ),
+            (
+                "parse",
+                lambda: JSONParser().parse(io.BytesIO(content)),
+                lambda: ORJSONParser().parse(io.BytesIO(content)),
+            ),
+        ):
+            default_time = min(timeit.repeat(default, number=number, repeat=repeat))
+            fast_time = min(timeit.repeat(fast, number=number, repeat=repeat))
+            self.stdout.write(
+                f"{label + ' ' + operation:<26}{page_size:>6}"
+                f"{default_time / number * 1000:>10.3f}"
+                f"{fast_time / number * 1000:>11.3f}"
+                f"{default_time / fast_time:>8.1f}x"
+            )
@@ -0,0 +1,97 @@
+import timeit
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from store.api.fast_serializers import get_fast_serializer
+from store.api.serializers import ProductDetailSerializer, ProductSearchSerializer
+from store.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the DRF product serializers with the fast read path "
+        "on in-memory pages of products. Rendering is identical for both and not timed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-sizes", nargs="+", type=int, default=[10, 100, 1000]
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        self.stdout.write(
+            f"{'serializer':<26}{'rows':>6}{'drf ms':>10}{'fast ms':>10}{'speedup':>9}"
+        )
+        for serializer_class in (ProductSearchSerializer, ProductDetailSerializer):
+            fast_serializer = get_fast_serializer(serializer_class)
+            for page_size in options["page_sizes"]:
+                products, rows = self.make_page(page_size, fast_serializer.lookups)
+
+                def drf():
+                    return serializer_class(products, many=True).data
+
+                def fast():
+                    return fast_serializer.serialize(rows)
+
+                if renderer.render(drf()) != renderer.render(fast()):
+                    raise AssertionError(
+                        f"{serializer_class.__name__} output differs from the fast path."
+                    )
+
+                number = max(1, 10000 // page_size)
+                drf_time = min(
+                    timeit.repeat(drf, number=number, repeat=options["repeat"])
+                )
+                fast_time = min(
+                    timeit.repeat(fast, number=number, repeat=options["repeat"])
+                )
+                self.stdout.write(
+                    f"{serializer_class.__name__:<26}{page_size:>6}"
+                    f"{drf_time / number * 1000:>10.3f}"
+                    f"{fast_time / number * 1000:>10.3f}"
+                    f"{drf_time / fast_time:>8.1f}x"
+                )
+
+    @staticmethod
+    def make_page(page_size: int, lookups: tuple[str, ...]):
+        """
+        Builds a page of unsaved products and the equivalent values() rows.
+        """
+        category = Category(id=1, name="Category")
+        now = timezone.now()
+        products = [
+            Product(
+                id=index,
+                name=f"Product {index}",
+                category=category,
+                price=Decimal("100.00") + index,
+                quantity=index,
+                discount=index % 30,
+                available=True,
+                cost_price=Decimal("50.00"),
+                discounted_price=(Decimal("100.00") + index) * (100 - index % 30) / 100,
+                created_at=now,
+                updated_at=now,
+            )
+            for index in range(1, page_size + 1)
+        ]
+        rows = [
+            {
+                "id": product.id,
+                "name": product.name,
+                "category__name": category.name,
+                "price": product.price,
+                "quantity": product.quantity,
+                "discount": product.discount,
+                "discounted_price": product.discounted_price,
+                "created_at": product.created_at,
+                "updated_at": product.updated_at,
+            }
+            for product in products
+        ]
+        return products, [{lookup: row[lookup] for lookup in lookups} for row in rows]
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api_schema import write_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the OpenAPI schema into OPENAPI_SCHEMA_DIR, where the schema "
+        "endpoints serve it from. Run it on deploy after the code changes."
+    )
+
+    def handle(self, *args, **options):
+        for path in write_schema():
+            self.stdout.write(f"Wrote {path}")
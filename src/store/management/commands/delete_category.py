@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from config.constants import CATEGORY_DELETE_CHUNK_SIZE
+from store.api.deletion import delete_category
+from store.models import Category
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes a category with all of its products in chunks, reporting the progress. "
+        "Use it for categories too big to delete within an HTTP request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("category_id", type=int)
+        parser.add_argument(
+            "--chunk-size", type=int, default=CATEGORY_DELETE_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        try:
+            category = Category.objects.get(pk=options["category_id"])
+        except Category.DoesNotExist:
+            raise CommandError(f"Category {options['category_id']} doesn't exist.")
+
+        total = category.product_set.count()
+        self.stdout.write(f"Deleting category {category.name!r} with {total} products.")
+        deleted = delete_category(
+            category,
+            chunk_size=options["chunk_size"],
+            progress=lambda deleted: self.stdout.write(
+                f"{deleted}/{total} products deleted"
+            ),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Category deleted with {deleted} products.")
+        )
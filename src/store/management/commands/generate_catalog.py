@@ -0,0 +1,175 @@
+import io
+import math
+import random
+import time
+from decimal import ROUND_CEILING, Decimal
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from config.constants import LOSS_FACTOR
+from store.api.cache import bump_catalog_version
+from store.models import Category, Product
+from validators import validate_price
+
+CENT = Decimal("0.01")
+# Discounts and their relative frequency; most products aren't discounted
+DISCOUNTS = (0, 0, 0, 0, 5, 10, 15, 20, 25)
+# Columns written by COPY; discounted_price is generated by the database
+COPY_COLUMNS = (
+    "name",
+    "category_id",
+    "price",
+    "quantity",
+    "discount",
+    "available",
+    "cost_price",
+    "created_at",
+    "updated_at",
+)
+
+
+def get_category_sizes(products: int, categories: int, skew: float) -> list[int]:
+    """
+    Splits the products over the categories following Zipf's law, so a few categories
+    hold most of the products. A skew of 0 gives categories of equal size.
+    """
+    weights = [1 / (rank**skew) for rank in range(1, categories + 1)]
+    total = sum(weights)
+    sizes = [math.floor(products * weight / total) for weight in weights]
+    # Hand out the rounding remainder to the biggest categories
+    for index in range(products - sum(sizes)):
+        sizes[index % categories] += 1
+    return sizes
+
+
+def make_prices(rng: random.Random) -> tuple[Decimal, Decimal, int]:
+    """
+    Returns a cost price, a price and a discount that satisfy validate_price.
+    Prices stay below 10000, which the price column can't hold.
+    """
+    discount = rng.choice(DISCOUNTS)
+    # Log-uniform cost prices, so cheap products are more common than expensive ones
+    cost_price = Decimal(math.exp(rng.uniform(0, math.log(3000)))).quantize(CENT)
+    # The lowest price whose discounted price isn't below the allowed loss
+    min_price = max(
+        cost_price, cost_price * LOSS_FACTOR / (1 - Decimal(discount) / 100)
+    )
+    markup = Decimal(rng.uniform(1, 1.6))
+    price = (min_price * markup).quantize(CENT, rounding=ROUND_CEILING)
+    validate_price(cost_price, price, discount)
+    return cost_price, price, discount
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a synthetic catalog with skewed category sizes and valid prices. "
+        "The same --seed and --prefix give the same catalog, so benchmarks of different "
+        "builds can run on identical data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument("--products", type=int, default=100_000)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.0,
+            help="Zipf exponent of the category sizes; 0 makes them equal.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--prefix",
+            default="Catalog",
+            help="Prefix of the generated names, which must not exist yet.",
+        )
+        parser.add_argument("--batch-size", type=int, default=50_000)
+        parser.add_argument(
+            "--bulk-create",
+            action="store_true",
+            help="Insert with bulk_create instead of COPY, e.g. on other databases than PostgreSQL.",
+        )
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if Category.objects.filter(name__startswith=f"{prefix} category ").exists():
+            raise CommandError(
+                f"A catalog with the prefix {prefix!r} already exists; use another --prefix."
+            )
+        use_copy = not options["bulk_create"]
+        if use_copy and connection.vendor != "postgresql":
+            raise CommandError("COPY requires PostgreSQL; use --bulk-create.")
+
+        rng = random.Random(options["seed"])
+        sizes = get_category_sizes(
+            options["products"], options["categories"], options["skew"]
+        )
+        started = time.perf_counter()
+        with transaction.atomic():
+            categories = Category.objects.bulk_create(
+                Category(name=f"{prefix} category {index}")
+                for index in range(1, options["categories"] + 1)
+            )
+            rows = self.generate_rows(rng, prefix, categories, sizes)
+            insert = self.copy_rows if use_copy else self.bulk_create_rows
+            inserted = 0
+            while batch := list(islice(rows, options["batch_size"])):
+                insert(batch)
+                inserted += len(batch)
+                self.stdout.write(f"{inserted}/{options['products']} products inserted")
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE store_category, store_product")
+        # Rows inserted in bulk don't send signals to the catalog cache
+        bump_catalog_version()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {options['categories']} categories and {inserted} products "
+                f"in {elapsed:.1f}s ({inserted / elapsed:.0f} products/s); "
+                f"the biggest category has {sizes[0]} products."
+            )
+        )
+
+    @staticmethod
+    def generate_rows(rng: random.Random, prefix: str, categories, sizes):
+        now = timezone.now()
+        number = 0
+        for category, size in zip(categories, sizes):
+            for _ in range(size):
+                number += 1
+                cost_price, price, discount = make_prices(rng)
+                yield (
+                    f"{prefix} product {number}",
+                    category.id,
+                    price,
+                    rng.randint(0, 500),
+                    discount,
+                    rng.random() < 0.9,
+                    cost_price,
+                    now,
+                    now,
+                )
+
+    @staticmethod
+    def copy_rows(rows: list[tuple]) -> None:
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(map(str, row)))
+            buffer.write("\n")
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {Product._meta.db_table} ({', '.join(COPY_COLUMNS)}) FROM STDIN",
+                buffer,
+            )
+
+    @staticmethod
+    def bulk_create_rows(rows: list[tuple]) -> None:
+        Product.objects.bulk_create(
+            Product(**dict(zip(COPY_COLUMNS, row))) for row in rows
+        )
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.4 on 2026-10-17 04:23
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0002_product_name_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="discounted_price",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.expressions.CombinedExpression(
+                    models.F("price"),
+                    "-",
+                    django.db.models.expressions.CombinedExpression(
+                        django.db.models.expressions.CombinedExpression(
+                            models.F("price"),
+                            "*",
+                            django.db.models.functions.comparison.Coalesce(
+                                "discount", 0
+                            ),
+                        ),
+                        "/",
+                        models.Value(100),
+                    ),
+                ),
+                output_field=models.DecimalField(decimal_places=4, max_digits=14),
+                verbose_name="Discounted price",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["discounted_price", "id"], name="product_discounted_price_idx"
+            ),
+        ),
+    ]
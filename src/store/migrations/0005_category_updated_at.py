@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-17 05:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0004_product_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name="Update at",
+            ),
+            preserve_default=False,
+        ),
+    ]
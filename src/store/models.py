@@ -1,8 +1,15 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models.functions import Coalesce, Upper
+
+from config.constants import PRODUCT_SEARCH_CONFIG
 
 
 class Category(models.Model):
     name = models.CharField(max_length=50, unique=True, verbose_name="Category name")
+    # Product detail validators include it, as product payloads render the category name
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Update at")
 
     def __str__(self):
         return self.name
@@ -15,8 +22,9 @@ class Category(models.Model):
 
 class Product(models.Model):
     name = models.CharField(max_length=50, unique=True, verbose_name="Product name")
+    # Indexed by product_category_price_idx, which leads with category_id
     category = models.ForeignKey(
-        Category, on_delete=models.CASCADE, verbose_name="Category"
+        Category, on_delete=models.CASCADE, db_index=False, verbose_name="Category"
     )
     price = models.DecimalField(
         default=0.00, max_digits=6, decimal_places=2, verbose_name="Price"
@@ -29,6 +37,14 @@ class Product(models.Model):
     cost_price = models.DecimalField(
         max_digits=6, decimal_places=2, verbose_name="Cost Price"
     )
+    # Price after applying the discount; equals the price when there is no discount
+    discounted_price = models.GeneratedField(
+        expression=models.F("price")
+        - models.F("price") * Coalesce("discount", 0) / 100,
+        output_field=models.DecimalField(max_digits=14, decimal_places=4),
+        db_persist=True,
+        verbose_name="Discounted price",
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Create at")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Update at")
 
@@ -39,3 +55,32 @@ class Product(models.Model):
         verbose_name = "Product"
         verbose_name_plural = "Products"
         ordering = ("id",)
+        indexes = [
+            # Serves "name" icontains lookups, which compile to UPPER(name) LIKE '%...%'
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="product_name_trgm_idx",
+            ),
+            # Serves full-text search on the product name
+            GinIndex(
+                SearchVector("name", config=PRODUCT_SEARCH_CONFIG),
+                name="product_name_search_idx",
+            ),
+            models.Index(
+                fields=("discounted_price", "id"),
+                name="product_discounted_price_idx",
+            ),
+            # Serves category filters combined with price ranges and price ordering
+            models.Index(
+                fields=("category", "price", "id"),
+                name="product_category_price_idx",
+            ),
+            # Serves price ranges ordered by id or by price
+            models.Index(fields=("price", "id"), name="product_price_idx"),
+            # Serves listings of available products in the default order
+            models.Index(
+                fields=("id",),
+                condition=models.Q(available=True),
+                name="product_available_idx",
+            ),
+        ]
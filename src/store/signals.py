@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from store.api.cache import bump_catalog_version
+from store.models import Category, Product
+
+
+# Product deletions are not connected: a post_delete receiver would stop Django from
+# fast-deleting products when a category is removed. Product delete paths bump explicitly.
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_cache(sender, **kwargs):
+    bump_catalog_version()
@@ -0,0 +1,645 @@
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from orders.models import Order, OrderItem
+from store.api.deletion import delete_category
+from store.models import Category, Product
+from users.models import User
+from validators import valid_price_condition
+
+
+@override_settings(SHARED_CACHE=False)
+class ProductQueryCountTests(APITestCase):
+    """
+    Guards the number of queries of the product endpoints, so N+1 regressions fail here.
+    The cache is cleared before every test, so each request misses it.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = Category.objects.bulk_create(
+            Category(name=f"Category {number}") for number in range(3)
+        )
+        # More products than a page, spread over several categories
+        Product.objects.bulk_create(
+            Product(
+                name=f"Product {number}",
+                category=categories[number % len(categories)],
+                price=Decimal("120.00"),
+                cost_price=Decimal("100.00"),
+                discount=number % 2 * 5,
+                quantity=5,
+            )
+            for number in range(25)
+        )
+        cls.product = Product.objects.first()
+        admin = User.objects.create(username="admin", role=User.ADMIN)
+        cls.token = Token.objects.create(user=admin)
+
+    def setUp(self):
+        cache.clear()
+
+    def authenticate(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def assert_queries(self, count: int, method: str, url: str, data=None):
+        with self.assertNumQueries(count):
+            response = getattr(self.client, method)(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response
+
+    def test_list(self):
+        # Conditional GET validators, the page and its count
+        self.assert_queries(3, "get", reverse("products-search-list"))
+
+    def test_list_next_page(self):
+        url = reverse("products-search-list")
+        self.assert_queries(3, "get", url)
+        # The validators of the list are shared by its pages
+        self.assert_queries(2, "get", url, {"page": 2})
+
+    def test_cursor_list(self):
+        url = reverse("products-search-list")
+        # The page only: cursor pages neither count nor aggregate the list
+        response = self.assert_queries(1, "get", url, {"pagination": "cursor"})
+        self.assert_queries(1, "get", response.data["next"])
+
+    def test_list_filtered_by_category(self):
+        # The category names are resolved to ids first
+        self.assert_queries(
+            4,
+            "get",
+            reverse("products-search-list"),
+            {"category": "Category 1,Category 2", "ordering": "price"},
+        )
+
+    def test_retrieve(self):
+        # Conditional GET validators and the product with its category
+        self.assert_queries(
+            2, "get", reverse("products-search-detail", args=[self.product.pk])
+        )
+
+    def test_retrieve_as_admin(self):
+        self.authenticate()
+        # The token with its user, the validators and the product
+        self.assert_queries(
+            3,
+            "get",
+            reverse("product-detail-update-destroy", args=[self.product.pk]),
+        )
+
+    def test_partial_update(self):
+        self.authenticate()
+        # The token with its user and a single UPDATE ... RETURNING in a savepoint,
+        # which is a plain transaction outside the test's one
+        response = self.assert_queries(
+            4,
+            "patch",
+            reverse("product-detail-update-destroy", args=[self.product.pk]),
+            {"price": "150.00"},
+        )
+        self.assertEqual(response.data["price"], "150.00")
+
+    def test_update(self):
+        self.authenticate()
+        # As above, and the deferred category FK is checked before the savepoint ends
+        response = self.assert_queries(
+            6,
+            "put",
+            reverse("product-detail-update-destroy", args=[self.product.pk]),
+            {
+                "name": "Renamed product",
+                "category_id": self.product.category_id,
+                "price": "130.00",
+                "cost_price": "100.00",
+                "quantity": 3,
+                "discount": 0,
+            },
+        )
+        self.assertEqual(response.data["name"], "Renamed product")
+
+
+class ConditionalRequestTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Category")
+        cls.product = Product.objects.create(
+            name="Product",
+            category=cls.category,
+            price=Decimal("120.00"),
+            cost_price=Decimal("100.00"),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_category_rename_changes_product_etag(self):
+        url = reverse("products-search-detail", args=[self.product.pk])
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.category.name = "Renamed category"
+        # The catalog cache is invalidated once the change commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["category"], "Renamed category")
+
+
+class ProductCursorPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Category")
+        # Long runs of equal prices, which the cursor must page through without an offset
+        Product.objects.bulk_create(
+            Product(
+                name=f"Product {number}",
+                category=category,
+                price=Decimal("10.00") if number % 3 else Decimal("20.00"),
+                cost_price=Decimal("5.00"),
+            )
+            for number in range(35)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_through_equal_prices(self):
+        expected = list(
+            Product.objects.order_by("-price", "-id").values_list("name", flat=True)
+        )
+        url = f"{reverse('products-search-list')}?pagination=cursor&ordering=-price"
+        names = []
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                names += [product["name"] for product in response.data["results"]]
+                url = response.data["next"]
+        self.assertEqual(names, expected)
+        for query in queries:
+            self.assertNotIn("OFFSET", query["sql"])
+
+        # And back from the last page
+        last_page = len(response.data["results"])
+        url = response.data["previous"]
+        names = []
+        while url:
+            response = self.client.get(url)
+            names = [product["name"] for product in response.data["results"]] + names
+            url = response.data["previous"]
+        self.assertEqual(names, expected[:-last_page])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            reverse("products-search-list"),
+            {"pagination": "cursor", "ordering": "price", "cursor": "cD1hYmMsMQ=="},
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AdminAPITestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create(username="admin", role=User.ADMIN)
+        cls.token = Token.objects.create(user=admin)
+        cls.category = Category.objects.create(name="Category")
+        cls.product = Product.objects.create(
+            name="Product",
+            category=cls.category,
+            price=Decimal("120.00"),
+            cost_price=Decimal("100.00"),
+            quantity=5,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def assert_rejected(self, response, message: str):
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"message": message})
+        # The rejected statement didn't abort the test's transaction
+        self.assertTrue(Product.objects.filter(pk=self.product.pk).exists())
+
+
+class CreateTests(AdminAPITestCase):
+    def create_product(self, **values):
+        return self.client.post(
+            reverse("product-create"),
+            {
+                "name": "New product",
+                "category_id": self.category.pk,
+                "price": "120.00",
+                "cost_price": "100.00",
+                "quantity": 1,
+                **values,
+            },
+            format="json",
+        )
+
+    def test_create_product(self):
+        response = self.create_product()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Product.objects.filter(name="New product").exists())
+
+    def test_create_product_with_duplicate_name(self):
+        self.assert_rejected(
+            self.create_product(name=self.product.name),
+            "A product with the same name already exists.",
+        )
+
+    def test_create_product_in_missing_category(self):
+        self.assert_rejected(
+            self.create_product(category_id=self.category.pk + 1000),
+            "This category doesn't exist.",
+        )
+
+    def test_create_category_with_duplicate_name(self):
+        self.assert_rejected(
+            self.client.post(
+                reverse("category-create"), {"name": self.category.name}, format="json"
+            ),
+            "A category with the same name already exists.",
+        )
+
+
+class UpdateTests(AdminAPITestCase):
+    def update_product(self, **values):
+        return self.client.patch(
+            reverse("product-detail-update-destroy", args=[self.product.pk]),
+            values,
+            format="json",
+        )
+
+    def test_duplicate_name(self):
+        Product.objects.create(
+            name="Other product",
+            category=self.category,
+            price=Decimal("120.00"),
+            cost_price=Decimal("100.00"),
+        )
+        self.assert_rejected(
+            self.update_product(name="Other product"),
+            "A product with the same name already exists.",
+        )
+
+    def test_missing_category(self):
+        self.assert_rejected(
+            self.update_product(category_id=self.category.pk + 1000),
+            "This category doesn't exist.",
+        )
+
+    def test_price_below_cost(self):
+        response = self.update_product(price="90.00")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.product.refresh_from_db(fields=["price"])
+        self.assertEqual(self.product.price, Decimal("120.00"))
+
+    def test_retry_after_prices_changed(self):
+        # The first UPDATE misses, as if the stored prices changed after the request began
+        conditions = iter([lambda *args: Q(pk__lt=0), valid_price_condition])
+        with mock.patch(
+            "store.api.views.valid_price_condition",
+            side_effect=lambda *args: next(conditions)(*args),
+        ):
+            response = self.update_product(price="130.00")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["price"], "130.00")
+
+    def test_conflict_when_retry_fails(self):
+        with mock.patch(
+            "store.api.views.valid_price_condition", return_value=Q(pk__lt=0)
+        ):
+            response = self.update_product(price="130.00")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data,
+            {"message": "The product's prices changed during the update, try again."},
+        )
+        self.product.refresh_from_db(fields=["price"])
+        self.assertEqual(self.product.price, Decimal("120.00"))
+
+
+class RepriceTests(AdminAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_category = Category.objects.create(name="Other category")
+        cls.cheap = Product.objects.create(
+            name="Cheap product",
+            category=cls.category,
+            price=Decimal("100.00"),
+            cost_price=Decimal("50.00"),
+        )
+        cls.expensive = Product.objects.create(
+            name="Expensive product",
+            category=cls.category,
+            price=Decimal("9000.00"),
+            cost_price=Decimal("50.00"),
+        )
+        cls.other = Product.objects.create(
+            name="Other product",
+            category=cls.other_category,
+            price=Decimal("100.00"),
+            cost_price=Decimal("50.00"),
+        )
+
+    def reprice(self, data: dict):
+        response = self.client.post(reverse("product-reprice"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def assert_prices(self, prices: dict):
+        for product, price in prices.items():
+            product.refresh_from_db(fields=["price", "discount"])
+            self.assertEqual(product.price, Decimal(price), product.name)
+
+    def test_rule(self):
+        data = self.reprice(
+            {
+                "rule": {
+                    "category_id": self.category.pk,
+                    "max_price": "1000.00",
+                    "price_change": "5.75",
+                }
+            }
+        )
+        self.assertEqual(data, {"updated": 2, "rejected": []})
+        self.assert_prices(
+            {
+                self.product: "126.90",
+                self.cheap: "105.75",
+                self.expensive: "9000.00",
+                self.other: "100.00",
+            }
+        )
+
+    def test_rule_rejections(self):
+        data = self.reprice(
+            {"rule": {"category_id": self.category.pk, "price_change": "-40"}}
+        )
+        self.assertEqual(data["updated"], 2)
+        self.assertEqual(
+            data["rejected"],
+            [
+                {
+                    "id": self.product.pk,
+                    "message": "Product price cannot be lower than the cost price.",
+                }
+            ],
+        )
+        self.assert_prices({self.product: "120.00", self.cheap: "60.00"})
+
+        data = self.reprice({"rule": {"min_price": "5000", "price_change": "100"}})
+        self.assertEqual(data["updated"], 0)
+        self.assertEqual(
+            data["rejected"],
+            [
+                {
+                    "id": self.expensive.pk,
+                    "message": "Product price must be lower than 10000.",
+                }
+            ],
+        )
+        self.assert_prices({self.expensive: "5400.00"})
+
+    def test_items(self):
+        missing_id = self.other.pk + 1000
+        data = self.reprice(
+            {
+                "items": [
+                    {"id": self.cheap.pk, "price": "110.00"},
+                    {"id": self.other.pk, "discount": 10},
+                    {"id": self.product.pk, "discount": 50},
+                    {"id": self.expensive.pk, "price": "10000.00"},
+                    {"id": missing_id, "price": "100.00"},
+                ]
+            }
+        )
+        self.assertEqual(data["updated"], 2)
+        self.assertEqual(
+            data["rejected"],
+            [
+                {
+                    "id": self.product.pk,
+                    "message": "Product price after applying discount cannot be lower "
+                    "than the cost price.",
+                },
+                {
+                    "id": self.expensive.pk,
+                    "message": "Product price must be lower than 10000.",
+                },
+                {"id": missing_id, "message": "This product doesn't exist."},
+            ],
+        )
+        self.assert_prices(
+            {
+                self.cheap: "110.00",
+                self.other: "100.00",
+                self.product: "120.00",
+                self.expensive: "9000.00",
+            }
+        )
+        self.assertEqual(self.other.discount, 10)
+        self.assertEqual(self.product.discount, 0)
+
+    def test_rule_or_items(self):
+        response = self.client.post(
+            reverse("product-reprice"),
+            {
+                "rule": {"price_change": "10"},
+                "items": [{"id": self.product.pk, "price": "130.00"}],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BulkUpsertTests(AdminAPITestCase):
+    def upsert(self, body, content_type: str):
+        response = self.client.post(
+            reverse("product-bulk-upsert"), body, content_type=content_type
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def product_row(self, name: str, **values) -> dict:
+        return {
+            "name": name,
+            "category_id": self.category.pk,
+            "price": "120.00",
+            "cost_price": "100.00",
+            "quantity": 1,
+            **values,
+        }
+
+    def assert_imported(self, data: dict, names: list[str]):
+        self.assertEqual(data, {"imported": len(names), "failed": 0, "errors": []})
+        self.assertEqual(
+            set(Product.objects.filter(name__in=names).values_list("name", flat=True)),
+            set(names),
+        )
+
+    def test_json(self):
+        data = self.upsert(
+            json.dumps([self.product_row("First"), self.product_row("Second")]),
+            "application/json",
+        )
+        self.assert_imported(data, ["First", "Second"])
+
+    def test_ndjson(self):
+        body = "\n".join(
+            json.dumps(row)
+            for row in (self.product_row("First"), self.product_row("Second"))
+        )
+        self.assert_imported(
+            self.upsert(body, "application/x-ndjson"), ["First", "Second"]
+        )
+
+    def test_csv(self):
+        body = (
+            "name,category_id,price,cost_price,quantity,discount\n"
+            f"First,{self.category.pk},120.00,100.00,1,\n"
+            f"Second,{self.category.pk},130.00,100.00,2,5\n"
+        )
+        self.assert_imported(self.upsert(body, "text/csv"), ["First", "Second"])
+        second = Product.objects.get(name="Second")
+        self.assertEqual((second.price, second.discount), (Decimal("130.00"), 5))
+
+    def test_update_existing_product(self):
+        data = self.upsert(
+            json.dumps(
+                [self.product_row(self.product.name, price="150.00", quantity=9)]
+            ),
+            "application/json",
+        )
+        self.assertEqual(data["imported"], 1)
+        self.product.refresh_from_db()
+        self.assertEqual(
+            (self.product.price, self.product.quantity), (Decimal("150.00"), 9)
+        )
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_row_errors(self):
+        body = "\n".join(
+            [
+                json.dumps(self.product_row("Valid")),
+                json.dumps(self.product_row("Below cost", price="90.00")),
+                json.dumps(self.product_row("Valid")),
+                json.dumps(
+                    self.product_row("No category", category_id=self.category.pk + 1000)
+                ),
+                "not json",
+            ]
+        )
+        data = self.upsert(body, "application/x-ndjson")
+        self.assertEqual(data["imported"], 1)
+        self.assertEqual(data["failed"], 4)
+        self.assertEqual(
+            data["errors"],
+            [
+                {
+                    "row": 2,
+                    "errors": {
+                        "non_field_errors": [
+                            "Product price cannot be lower than the cost price."
+                        ]
+                    },
+                },
+                {
+                    "row": 3,
+                    "errors": {
+                        "message": "A product with the same name is already in the import."
+                    },
+                },
+                {"row": 4, "errors": {"message": "This category doesn't exist."}},
+                {"row": 5, "errors": {"message": "Expected an object."}},
+            ],
+        )
+        self.assertTrue(Product.objects.filter(name="Valid").exists())
+        self.assertFalse(Product.objects.filter(name="Below cost").exists())
+
+    def test_not_a_list(self):
+        response = self.client.post(
+            reverse("product-bulk-upsert"), self.product_row("First"), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DeleteCategoryTests(AdminAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Product.objects.bulk_create(
+            Product(
+                name=f"Deleted {number}",
+                category=cls.category,
+                price=Decimal("120.00"),
+                cost_price=Decimal("100.00"),
+            )
+            for number in range(4)
+        )
+        cls.kept_category = Category.objects.create(name="Kept category")
+        cls.kept_product = Product.objects.create(
+            name="Kept product",
+            category=cls.kept_category,
+            price=Decimal("120.00"),
+            cost_price=Decimal("100.00"),
+        )
+        order = Order.objects.create(
+            user=User.objects.create(username="client", role=User.CLIENT),
+            total_price=Decimal("240.00"),
+        )
+        cls.deleted_item, cls.kept_item = OrderItem.objects.bulk_create(
+            OrderItem(
+                order=order,
+                product=product,
+                product_name=product.name,
+                price=product.price,
+                quantity=1,
+            )
+            for product in (cls.product, cls.kept_product)
+        )
+
+    def test_delete_category(self):
+        progress = []
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted = delete_category(
+                self.category, chunk_size=2, progress=progress.append
+            )
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(progress, [2, 4, 5])
+        self.assertFalse(Category.objects.filter(pk=self.category.pk).exists())
+        self.assertEqual(
+            list(Product.objects.values_list("pk", flat=True)), [self.kept_product.pk]
+        )
+        self.assertTrue(Category.objects.filter(pk=self.kept_category.pk).exists())
+        # Order history is kept without the deleted product
+        self.deleted_item.refresh_from_db()
+        self.assertIsNone(self.deleted_item.product_id)
+        self.assertEqual(self.deleted_item.product_name, self.product.name)
+        self.kept_item.refresh_from_db()
+        self.assertEqual(self.kept_item.product_id, self.kept_product.pk)
+
+    def test_delete_endpoint(self):
+        response = self.client.delete(
+            reverse("category-detail-delete", args=[self.category.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Product.objects.filter(category=self.category).exists())
+        self.assertTrue(Product.objects.filter(pk=self.kept_product.pk).exists())
@@ -1,8 +1,16 @@
 from django.urls import path, include
 
+from store.api.async_views import (
+    AsyncCategorySearchView,
+    AsyncProductSearchDetailView,
+    AsyncProductSearchListView,
+)
 from store.api.router import router
 from store.api.views import (
     ProductCreateAPIView,
+    ProductBulkUpsertAPIView,
+    ProductExportAPIView,
+    ProductRepriceAPIView,
     ProductDetailUpdateAPIView,
     CategoryCreateAPIView,
     CategoryDetailAPIView,
@@ -20,6 +28,21 @@ urlpatterns = [
                 path(
                     "products/", ProductCreateAPIView.as_view(), name="product-create"
                 ),
+                path(
+                    "products/bulk/",
+                    ProductBulkUpsertAPIView.as_view(),
+                    name="product-bulk-upsert",
+                ),
+                path(
+                    "products/reprice/",
+                    ProductRepriceAPIView.as_view(),
+                    name="product-reprice",
+                ),
+                path(
+                    "products/export/",
+                    ProductExportAPIView.as_view(),
+                    name="product-export",
+                ),
                 path(
                     "products/<int:pk>/",
                     ProductDetailUpdateAPIView.as_view(),
@@ -40,6 +63,22 @@ urlpatterns = [
                     CategorySearchAPIView.as_view(),
                     name="category-search",
                 ),
+                # Async versions of the read endpoints, for the ASGI entry point
+                path(
+                    "async/products/search/",
+                    AsyncProductSearchListView.as_view(),
+                    name="async-products-search-list",
+                ),
+                path(
+                    "async/products/search/<int:pk>/",
+                    AsyncProductSearchDetailView.as_view(),
+                    name="async-products-search-detail",
+                ),
+                path(
+                    "async/categories/search",
+                    AsyncCategorySearchView.as_view(),
+                    name="async-category-search",
+                ),
             ]
         ),
     )
@@ -1,25 +1,21 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework.permissions import AllowAny
 
+from api_schema import API_INFO, OpenAPISchemaView
+from db_pool.views import DatabasePoolStatsAPIView
+from metrics.views import MetricsView
+
 
 schema_view = get_schema_view(
-    openapi.Info(
-        title="Online Store api",
-        default_version="v1",
-        description="API for an online store. Allows retrieving information about products,"
-        "categories, placing orders, and much more.",
-    ),
+    API_INFO,
     public=True,
     permission_classes=[AllowAny],
 )
 
 swagger_urlpatterns = [
-    path(
-        "swagger<format>/", schema_view.without_ui(cache_timeout=0), name="schema-json"
-    ),
+    path("swagger<format>/", OpenAPISchemaView.as_view(), name="schema-json"),
     path(
         "swagger/",
         schema_view.with_ui("swagger", cache_timeout=0),
@@ -31,10 +27,13 @@ swagger_urlpatterns = [
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("store.urls")),
+    path("", include("orders.urls")),
     # auth
     path("api/auth/", include("rest_framework.urls")),
     path("auth/", include("djoser.urls")),
     path(r"auth/", include("djoser.urls.authtoken")),
+    path("db-pool/", DatabasePoolStatsAPIView.as_view(), name="db-pool-stats"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
 
 urlpatterns += swagger_urlpatterns
@@ -1,7 +1,34 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as BaseUserManager
 from django.db import models
+from rest_framework.authtoken.models import Token
 from rest_framework.exceptions import ValidationError
 
+from authentication import CACHED_USER_FIELDS, invalidate_token
+
+
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Invalidates the cached tokens of the updated users when a field cached by
+        CachedTokenAuthentication changes, as update() doesn't send post_save.
+        """
+        if not set(kwargs) & set(CACHED_USER_FIELDS):
+            return super().update(**kwargs)
+        keys = list(
+            Token.objects.filter(user__in=self.values("pk")).values_list(
+                "key", flat=True
+            )
+        )
+        updated = super().update(**kwargs)
+        for key in keys:
+            invalidate_token(key)
+        return updated
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    pass
+
 
 class User(AbstractUser):
     ADMIN = 1
@@ -19,6 +46,8 @@ class User(AbstractUser):
         choices=ROLE_CHOICES, blank=True, null=True, default=CLIENT
     )
 
+    objects = UserManager()
+
     @property
     def is_admin(self):
         return self.role == self.ADMIN
@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from authentication import CachedTokenAuthentication
+from store.models import Category, Product
+from users.models import User
+
+
+@override_settings(SHARED_CACHE=True)
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_user_fields(self):
+        user = User.objects.create(username="client", role=User.CLIENT)
+        token = Token.objects.create(user=user)
+        authentication = CachedTokenAuthentication()
+        authentication.authenticate_credentials(token.key)
+
+        with self.assertNumQueries(0):
+            cached_user, _ = authentication.authenticate_credentials(token.key)
+            self.assertEqual(cached_user.pk, user.pk)
+            self.assertEqual(cached_user.role, User.CLIENT)
+            self.assertIs(cached_user.is_active, True)
+
+    def test_request_with_cached_token(self):
+        category = Category.objects.create(name="Category")
+        product = Product.objects.create(
+            name="Product",
+            category=category,
+            price=Decimal("120.00"),
+            cost_price=Decimal("100.00"),
+        )
+        url = reverse("products-search-detail", args=[product.pk])
+        for role in (User.CLIENT, User.ADMIN):
+            with self.subTest(role=role):
+                cache.clear()
+                user = User.objects.create(username=f"user-{role}", role=role)
+                token = Token.objects.create(user=user)
+                CachedTokenAuthentication().authenticate_credentials(token.key)
+                # Conditional GET validators and the product, nothing for the user
+                with self.assertNumQueries(2):
+                    response = self.client.get(
+                        url, HTTP_AUTHORIZATION=f"Token {token.key}"
+                    )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                # Only staff and admins get the Server-Timing header
+                self.assertEqual("Server-Timing" in response, role == User.ADMIN)
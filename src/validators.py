@@ -1,15 +1,22 @@
 from decimal import Decimal
+from typing import Optional
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThanOrEqual
 from rest_framework import serializers
 from config.constants import LOSS_FACTOR
 
 
-def validate_price(cost_price: Decimal, price: Decimal, discount: int) -> None:
+def validate_price(
+    cost_price: Decimal, price: Decimal, discount: Optional[int]
+) -> None:
     """
     Validates the product price after applying a discount to ensure it does not fall below its cost price.
     """
     # Calculate the minimum acceptable price after discount
     min_acceptable_price = cost_price * LOSS_FACTOR
-    price_after_discount = price * (1 - Decimal(discount) / 100)
+    # A missing discount counts as none, like the Coalesce in valid_price_condition
+    price_after_discount = price * (1 - Decimal(discount or 0) / 100)
 
     # Check if the price is below the cost price
     if price < cost_price:
@@ -21,3 +28,18 @@ def validate_price(cost_price: Decimal, price: Decimal, discount: int) -> None:
         raise serializers.ValidationError(
             "Product price after applying discount cannot be lower than the cost price."
         )
+
+
+def valid_price_condition(cost_price, price, discount) -> Q:
+    """
+    SQL counterpart of validate_price for conditional updates.
+    Arguments are values or expressions such as F("price"), so unchanged fields are read from the row.
+    """
+    cost_price, price, discount = (
+        value if hasattr(value, "resolve_expression") else Value(value)
+        for value in (cost_price, price, discount)
+    )
+    price_after_discount = price - price * Coalesce(discount, 0) / Value(Decimal(100))
+    return Q(GreaterThanOrEqual(price, cost_price)) & Q(
+        GreaterThanOrEqual(price_after_discount, cost_price * Value(LOSS_FACTOR))
+    )